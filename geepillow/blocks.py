@@ -10,8 +10,9 @@ There are 2 types:
 If the user needs to add text overlaying the image, can do it using the PIL library.
 """
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal, Union
+from typing import Any, Literal, Union
 
 from PIL import Image as ImPIL
 from PIL import ImageDraw
@@ -20,7 +21,6 @@ from PIL.ImageFont import FreeTypeFont, ImageFont, TransposedFont
 from geepillow import colors, fonts
 from geepillow.colors import Color
 
-DEFAULT_FONT = fonts.opensans_regular(12)
 DEFAULT_MODE = "RGBA"
 
 FontType = Union[ImageFont, FreeTypeFont, TransposedFont]
@@ -37,12 +37,127 @@ PositionType = Literal[
     "bottom-right",
 ]
 
+ResamplingType = Literal["default", "fast", "quality"]
+
+# resampling filter and reducing gap of each resampling policy (see ImPIL.Image.resize)
+RESAMPLING = {
+    "fast": (ImPIL.Resampling.BILINEAR, 2.0),
+    "quality": (ImPIL.Resampling.LANCZOS, 3.0),
+}
+
+
+# how many times the target size JPEG images are decoded at, at least (see draft)
+DRAFT_MARGIN = {"default": 2, "fast": 1, "quality": 2}
+
+
+def draft(image: ImPIL.Image, size: tuple[int, int], resampling: ResamplingType):
+    """Decode a JPEG image at a reduced scale when it will be shrunk anyway.
+
+    JPEG images are decoded at the smallest scale (1/2, 1/4 or 1/8, see ImPIL.Image.draft) that still
+    covers the size times the margin of the resampling policy (see :data:`DRAFT_MARGIN`), instead of decoding
+    the whole image to shrink it afterwards. "fast" decodes just what covers the size; the other policies keep
+    twice the size, so the resampling filter still has the detail it needs. Other formats are not affected.
+
+    Args:
+        image: an image opened but not loaded yet.
+        size: the smallest size the image will be resized to.
+        resampling: the resampling policy of the block.
+    """
+    margin = DRAFT_MARGIN[resampling]
+    image.draft(None, (int(size[0] * margin), int(size[1] * margin)))
+
+
+def default_font() -> FreeTypeFont:
+    """Font of the text blocks if none is given. It's loaded on first use."""
+    return fonts.opensans_regular(12)
+
+
+def __getattr__(name: str) -> Any:
+    """Load DEFAULT_FONT on first access instead of when importing the module."""
+    if name == "DEFAULT_FONT":
+        return default_font()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=1024)
+def text_size(font: FontType, text: str) -> tuple[int, int]:
+    """Width and height of a multiline text.
+
+    Labels repeat a lot (dates, names), so each text is measured once per font.
+
+    Args:
+        font: the font of the text.
+        text: the text to measure.
+    """
+    width: float = 0
+    height: float = 0
+    for line in text.split("\n"):
+        _, top, right, bottom = font.getbbox(line)
+        width = max(width, right)
+        height += bottom + top
+    return int(width), int(height)
+
+
+@lru_cache(maxsize=1024)
+def fit_font(
+    font: FontType, text: str, box: tuple[int, int], min_size: int = 1, max_size: int | None = None
+) -> FontType:
+    """Largest size of the font that fits the text in the box.
+
+    The sizes are binary searched measuring the text (see :func:`text_size`), nothing is rendered. The
+    fonts of each size come from the fonts registry, so fitting the same text again costs nothing.
+
+    Args:
+        font: the font of the text. Only its file is used, not its size.
+        text: the text to fit.
+        box: width and height available for the text.
+        min_size: minimum font size. It's returned if not even this size fits.
+        max_size: maximum font size. If None it's the height of the box.
+    """
+    width, height = box
+    low, high = min_size, max_size or int(height)
+    best = fonts.create(font, low)
+    while low <= high:
+        size = (low + high) // 2
+        candidate = fonts.create(font, size)
+        text_width, text_height = text_size(candidate, text)
+        if text_width <= width and text_height <= height:
+            best, low = candidate, size + 1
+        else:
+            high = size - 1
+    return best
+
+
+@lru_cache(maxsize=256)
+def text_image(
+    font: FontType, text: str, text_hex: str, background_hex: str, mode: str
+) -> ImPIL.Image:
+    """Image of a multiline text.
+
+    Each label is rendered once for each font, colors and mode. The image is shared, so it must not be
+    modified in place; copy it instead (see :meth:`TextBlock.create_text_image`).
+
+    Args:
+        font: the font of the text.
+        text: the text to render.
+        text_hex: the color of the text.
+        background_hex: the color of the background.
+        mode: the mode of the image.
+    """
+    image = ImPIL.new(mode, text_size(font, text), background_hex)
+    draw = ImageDraw.Draw(image)
+    draw.text((0, 0), text, font=font, fill=text_hex)
+    return image
+
 
 class Block:
     """Basic Block."""
 
     DEFAULT_SIZE = (500, 500)
 
+    # rendered image, cleared every time a property that affects it is modified
+    _rendered: ImPIL.Image | None = None
+
     def __init__(
         self,
         size: tuple = DEFAULT_SIZE,
@@ -58,6 +173,9 @@ class Block:
         This object is mutable. All properties, except "element" can be
         modified.
 
+        The rendered image is cached until one of the properties is modified, so it
+        must not be modified in place (copy it first).
+
         Args:
             size: size of the block in pixels.
             background_color: color of the background.
@@ -70,10 +188,38 @@ class Block:
         self.background_opacity = background_opacity
         self.mode = mode
 
+    def invalidate(self):
+        """Discard the cached rendered image, it'll be rendered again on next access."""
+        self._rendered = None
+
     @property
     def image(self):
         """For basic blocks the image is the background image."""
-        return self.background_image
+        if self._rendered is None:
+            self._rendered = self.background_image
+        return self._rendered
+
+    @property
+    def background_opacity(self) -> float:
+        """Background opacity."""
+        return self._background_opacity
+
+    @background_opacity.setter
+    def background_opacity(self, opacity: float):
+        """Set or modify the background opacity."""
+        self._background_opacity = opacity
+        self.invalidate()
+
+    @property
+    def mode(self) -> str:
+        """Mode of the background image."""
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: str):
+        """Set or modify the mode of the background image."""
+        self._mode = mode
+        self.invalidate()
 
     @property
     def background_hex(self):
@@ -89,6 +235,7 @@ class Block:
     def background_color(self, color: str | Color):
         """Set or modify the background color."""
         self._background_color = colors.create(color)
+        self.invalidate()
 
     @property
     def size(self):
@@ -101,6 +248,7 @@ class Block:
         self._size = size
         self._width = size[0]
         self._height = size[1]
+        self.invalidate()
 
     def set_size(self, size: tuple):
         """Set or modify the size of the block."""
@@ -118,6 +266,7 @@ class Block:
         size = list(self.size)
         size[0] = width
         self._size = tuple(size)
+        self.invalidate()
 
     @property
     def height(self):
@@ -131,6 +280,7 @@ class Block:
         size = list(self.size)
         size[1] = height
         self._size = tuple(size)
+        self.invalidate()
 
     @property
     def background_image(self):
@@ -140,9 +290,12 @@ class Block:
 
 
 class ImageBlock(Block):
+    # resized image, cleared every time a property that affects it is modified
+    _element: ImPIL.Image | None = None
+
     def __init__(
         self,
-        image: ImPIL.Image,
+        image: ImPIL.Image | None,
         position: tuple | PositionType = "center-center",
         fit_block: bool = True,
         keep_proportion: bool = True,
@@ -150,9 +303,16 @@ class ImageBlock(Block):
         background_color: str | Color = "white",
         background_opacity: float = 1,
         mode: str = DEFAULT_MODE,
+        resampling: ResamplingType = "default",
     ):
         """Image Block for PIL images.
 
+        The image can be None for blocks that load it later (see :meth:`load`), in that case
+        the size of the block is required.
+
+        The image is converted to the block mode. If it's already in that mode it's used as is (not
+        copied), so it must not be modified in place.
+
         Args:
             image: the image.
             position: position of the image inside the block.
@@ -162,10 +322,20 @@ class ImageBlock(Block):
             background_color: color of the background.
             background_opacity: opacity of the background.
             mode: mode of the background image.
+            resampling: how the image is resized to the element size. "default" uses the default filter of
+                Pillow, "fast" a bilinear filter after reducing the image by integer factors, and "quality" a
+                Lanczos filter after a gentler reduction. Downscaling big images is much faster with both.
         """
-        size = size or image.size
-        # convert image to the block mode
-        self._image = image.convert(mode)  # store the original image
+        if image is None and size is None:
+            raise ValueError("The size of the block is required if the image is not loaded.")
+        size = size or image.size  # type: ignore[union-attr]
+        # convert image to the block mode, it's not copied if it's already in the block mode
+        converted = image is not None and image.mode != mode
+        if converted:
+            image = image.convert(mode)  # type: ignore[union-attr]
+        self._image = image  # store the original image
+        # whether nobody else holds the original image, so it can be handed out as the block image
+        self._owns_source = converted
         super(ImageBlock, self).__init__(
             size=size,
             background_color=background_color,
@@ -175,13 +345,103 @@ class ImageBlock(Block):
         self.position = position
         self.fit_block = fit_block
         self.keep_proportion = keep_proportion
+        self.resampling = resampling
+
+    def invalidate(self):
+        """Discard the cached element and rendered image, they'll be rendered again on next access."""
+        super(ImageBlock, self).invalidate()
+        self._element = None
+
+    @property
+    def position(self) -> tuple | PositionType:
+        """Position of the image inside the block."""
+        return self._position
+
+    @position.setter
+    def position(self, position: tuple | PositionType):
+        """Set or modify the position of the image inside the block."""
+        self._position = position
+        self.invalidate()
+
+    @property
+    def fit_block(self) -> bool:
+        """If True the element's boundaries will never exceed the block."""
+        return self._fit_block
+
+    @fit_block.setter
+    def fit_block(self, fit_block: bool):
+        """Set or modify fit_block."""
+        self._fit_block = fit_block
+        self.invalidate()
+
+    @property
+    def keep_proportion(self) -> bool:
+        """Keep proportion (ratio) of the image."""
+        return self._keep_proportion
+
+    @keep_proportion.setter
+    def keep_proportion(self, keep_proportion: bool):
+        """Set or modify keep_proportion."""
+        self._keep_proportion = keep_proportion
+        self.invalidate()
+
+    @property
+    def resampling(self) -> ResamplingType:
+        """How the image is resized to the element size."""
+        return self._resampling
+
+    @resampling.setter
+    def resampling(self, resampling: ResamplingType):
+        """Set or modify the resampling policy."""
+        if resampling != "default" and resampling not in RESAMPLING:
+            raise ValueError(f"Resampling '{resampling}' not in {['default', *RESAMPLING]}")
+        self._resampling = resampling
+        self.invalidate()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the original image has been loaded."""
+        return self._image is not None
+
+    @property
+    def source(self) -> ImPIL.Image:
+        """The original image converted to the block mode. It's loaded on first access if needed."""
+        if self._image is None:
+            image = self.load()
+            self._image = image if image.mode == self.mode else image.convert(self.mode)
+            self._owns_source = True
+        return self._image
+
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the original image.
+
+        Subclasses that know the size before loading the image can override it to avoid loading it.
+        """
+        return self.source.size
+
+    def load(self) -> ImPIL.Image:
+        """Load the original image.
+
+        Blocks created without an image must implement it.
+        """
+        raise ValueError(f"{type(self).__name__} has no image to load.")
+
+    def unload(self):
+        """Discard the original image and everything rendered from it to free their memory.
+
+        Only for blocks that can load the image again (see :meth:`load`).
+        """
+        self._image = None
+        self.invalidate()
 
     @property
     def xy(self):
         """Coordinates (X,Y) of the top-left corner of the inner image."""
         if isinstance(self.position, str):
-            x_space = self.width - self.element.width
-            y_space = self.height - self.element.height
+            element_width, element_height = self.element_size
+            x_space = self.width - element_width
+            y_space = self.height - element_height
             options = {
                 "top-left": (0, 0),
                 "top-center": (x_space / 2, 0),
@@ -202,60 +462,172 @@ class ImageBlock(Block):
             return self.position
 
     @property
-    def element(self) -> ImPIL.Image:
-        """Element.
+    def element_size(self) -> tuple[int, int]:
+        """Size of the element.
 
-        The original image will be modified according to size of the block and properties fit_block and keep_proportion.
+        It's computed from the size of the original image, the size of the block and properties fit_block and
+        keep_proportion.
         """
         # use the original image to compute the resizing parameters
-        image_width, image_height = self._image.size
+        image_width, image_height = self.source_size
+        if not self.fit_block:
+            return image_width, image_height
         block_width, block_height = self.size
         # is the image wider or higher than the block?
         is_wider, is_higher = image_width > block_width, image_height > block_height
-        element = self._image
-        if self.fit_block:
-            # resize to fit the block
-            if self.keep_proportion:
-                proportion = self._image.size[0] / self._image.size[1]
-                if is_wider and is_higher:
-                    # fit according to the block proportions
-                    if proportion >= 0:  # its width is more than its height
-                        # adapt image to the block height
-                        new_height = block_height
-                        new_width = int(new_height * proportion)
-                    else:
-                        # adapt image to the block width
-                        new_width = block_width
-                        new_height = int(new_width / proportion)
-                elif is_wider:  # is wider than the block but not higher
-                    new_width = block_width
-                    new_height = int(new_width / proportion)
-                elif is_higher:  # is higher than the block but not wider
+        # resize to fit the block
+        if self.keep_proportion:
+            proportion = image_width / image_height
+            if is_wider and is_higher:
+                # fit according to the block proportions
+                if proportion >= 0:  # its width is more than its height
+                    # adapt image to the block height
                     new_height = block_height
                     new_width = int(new_height * proportion)
-                else:  # is not wider or higher than the block
-                    new_width = image_width
-                    new_height = image_height
-                new_size = (new_width, new_height)
-            else:
-                new_size = (block_width, block_height)
-            if new_size != self._image.size:
+                else:
+                    # adapt image to the block width
+                    new_width = block_width
+                    new_height = int(new_width / proportion)
+            elif is_wider:  # is wider than the block but not higher
+                new_width = block_width
+                new_height = int(new_width / proportion)
+            elif is_higher:  # is higher than the block but not wider
+                new_height = block_height
+                new_width = int(new_height * proportion)
+            else:  # is not wider or higher than the block
+                new_width = image_width
+                new_height = image_height
+            return new_width, new_height
+        return block_width, block_height
+
+    @property
+    def element(self) -> ImPIL.Image:
+        """Element.
+
+        The original image will be modified according to size of the block and properties fit_block and keep_proportion.
+        """
+        if self._element is None:
+            element = self.source
+            new_size = self.element_size
+            if new_size != element.size:
                 # resize only is size changed
-                element = element.resize(new_size)
-        return element
+                element = self.resize(element, new_size)
+            self._element = element
+        return self._element
+
+    def resize(self, image: ImPIL.Image, size: tuple[int, int]) -> ImPIL.Image:
+        """Resize an image following the resampling policy of the block.
+
+        Args:
+            image: the image to resize.
+            size: the new size.
+        """
+        if self.resampling == "default":
+            return image.resize(size)
+        resample, reducing_gap = RESAMPLING[self.resampling]
+        # the image is first reduced by integer factors (ImPIL.Image.reduce), that is much faster
+        return image.resize(size, resample, reducing_gap=reducing_gap)
 
     @property
     def image(self) -> ImPIL:
         """Image of the block."""
-        im = self.background_image
-        im.paste(self.element, self.xy)
-        return im
+        if self._rendered is None:
+            element = self.element
+            if element.size == tuple(self.size) and self.xy == (0, 0) and element.mode == self.mode:
+                # the element covers the whole background, there is nothing to paste it on. It's copied if
+                # it's the image given to the block, drawing on the block image must not modify it
+                is_shared = element is self._image and not self._owns_source
+                self._rendered = element.copy() if is_shared else element
+            else:
+                im = self.background_image
+                im.paste(element, self.xy)
+                self._rendered = im
+        return self._rendered
 
     @classmethod
-    def from_file(cls, filename: str | Path, **kwargs):
-        """Create an ImageBlock from a file."""
+    def from_file(cls, filename: str | Path, lazy: bool = False, **kwargs):
+        """Create an ImageBlock from a file.
+
+        With a given size and fit_block, JPEG images may be decoded at a reduced scale that still covers the
+        block, see :func:`draft`.
+
+        Args:
+            filename: path of the image file.
+            lazy: if True it creates a :class:`FileImageBlock`, that decodes the image when it's rendered.
+            kwargs: the arguments of the block.
+        """
         filename = Path(filename)
-        return cls(ImPIL.open(filename), **kwargs)
+        if lazy:
+            return FileImageBlock(filename, **kwargs)
+        image = ImPIL.open(filename)
+        size = kwargs.get("size")
+        if kwargs.get("fit_block", True) and size:
+            draft(image, size, kwargs.get("resampling", "default"))
+        return cls(image, **kwargs)
+
+
+class FileImageBlock(ImageBlock):
+    """Image block for an image file, decoded when it's rendered."""
+
+    def __init__(
+        self,
+        filename: str | Path,
+        position: tuple | PositionType = "center-center",
+        fit_block: bool = True,
+        keep_proportion: bool = True,
+        size: tuple | None = None,
+        background_color: str | Color = "white",
+        background_opacity: float = 1,
+        mode: str = DEFAULT_MODE,
+        resampling: ResamplingType = "default",
+    ):
+        """Image block for an image file, decoded when it's rendered.
+
+        Only the header of the file is read when the block is created, so it's cheap to lay out many of them.
+        The image is decoded on first access to it (``image``, ``element``, ``source``). JPEG images may be
+        decoded at a reduced scale that still covers the element, see :func:`draft`.
+
+        Args:
+            filename: path of the image file.
+            position: position of the image inside the block.
+            fit_block: if True the element's boundaries will never exceed the block.
+            keep_proportion: keep proportion (ratio) of the image.
+            size: size of the block (not the image). Defaults to the image size.
+            background_color: color of the background.
+            background_opacity: opacity of the background.
+            mode: mode of the background image.
+            resampling: how the image is resized to the element size. See :class:`ImageBlock`.
+        """
+        self.filename = Path(filename)
+        with ImPIL.open(self.filename) as image:
+            self._source_size = image.size
+        super(FileImageBlock, self).__init__(
+            image=None,
+            position=position,
+            fit_block=fit_block,
+            keep_proportion=keep_proportion,
+            size=size or self._source_size,
+            background_color=background_color,
+            background_opacity=background_opacity,
+            mode=mode,
+            resampling=resampling,
+        )
+
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the image in the file, read from its header.
+
+        The element size is computed from it, even if the image is decoded at a smaller scale.
+        """
+        return self._source_size
+
+    def load(self) -> ImPIL.Image:
+        """Decode the image file."""
+        with ImPIL.open(self.filename) as image:
+            if self.fit_block:
+                draft(image, self.element_size, self.resampling)
+            image.load()
+            return image
 
 
 class TextBlock(ImageBlock):
@@ -265,7 +637,7 @@ class TextBlock(ImageBlock):
         self,
         text: str,
         position: tuple | PositionType = "center-center",
-        font: FontType = DEFAULT_FONT,
+        font: FontType | None = None,
         text_color: str | Color = "black",
         text_opacity: float | int = 1,
         background_color: str | Color = "white",
@@ -280,7 +652,8 @@ class TextBlock(ImageBlock):
         Args:
             text: text to display.
             position: position of the text inside the block.
-            font: font to use. The size the font is included in this parameter.
+            font: font to use. The size the font is included in this parameter. If None it uses
+                :func:`default_font`.
             text_color: color of the text.
             text_opacity: opacity of the text.
             background_color: color of the background.
@@ -291,9 +664,11 @@ class TextBlock(ImageBlock):
             mode: mode of the background image.
         """
         self._text = text
+        # the size follows the text image when the text changes
+        self._auto_size = size is None
         self._text_color = colors.create(text_color)
         self.text_opacity = text_opacity
-        self._font = font
+        self._font = font if font is not None else default_font()
         self._background_color = colors.create(background_color)
         self.background_opacity = background_opacity
         self.mode = mode
@@ -307,12 +682,19 @@ class TextBlock(ImageBlock):
             size=size,
             mode=mode,
         )
+        self._owns_source = True
 
     @property
     def text(self) -> str:
         """Text to display."""
         return self._text
 
+    @text.setter
+    def text(self, text: str):
+        """Set or modify the text to display."""
+        self._text = text
+        self.update_text_image()
+
     @property
     def font(self):
         """Font to use."""
@@ -322,7 +704,7 @@ class TextBlock(ImageBlock):
     def font(self, font: ImageFont | FreeTypeFont | TransposedFont):
         """Set or modify the font to use."""
         self._font = font
-        self._image = self.create_text_image()
+        self.update_text_image()
 
     @property
     def text_color(self) -> Color:
@@ -333,29 +715,63 @@ class TextBlock(ImageBlock):
     def text_color(self, color: str | Color):
         """Set or modify the text color."""
         self._text_color = colors.create(color)
+        self.update_text_image()
+
+    @property
+    def background_color(self) -> Color:
+        """Background color."""
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, color: str | Color):
+        """Set or modify the background color."""
+        self._background_color = colors.create(color)
+        self.update_text_image()
+
+    @classmethod
+    def fit(
+        cls,
+        text: str,
+        size: tuple,
+        font: FontType | None = None,
+        min_font_size: int = 1,
+        **kwargs,
+    ) -> "TextBlock":
+        """Create a TextBlock with the largest font size that fits the text in the block.
+
+        Args:
+            text: text to display.
+            size: size of the block.
+            font: font to use, only its file is used. If None it uses :func:`default_font`.
+            min_font_size: minimum font size, used even if the text doesn't fit.
+            kwargs: the rest of the arguments of the TextBlock.
+        """
+        font = font if font is not None else default_font()
+        box = (int(size[0]), int(size[1]))
+        return cls(text, font=fit_font(font, text, box, min_font_size), size=size, **kwargs)
+
+    def update_text_image(self):
+        """Create the text image again after a property that affects it was modified."""
+        self._image = self.create_text_image()
+        self._owns_source = True
+        if self._auto_size:
+            self.size = self._image.size
+        self.invalidate()
 
     @property
     def text_height(self) -> int:
         """Calculate height for a multiline text."""
-        alist = self.text.split("\n")
-        alt = 0
-        for line in alist:
-            alt += self.font.getbbox(line)[3] + self.font.getbbox(line)[1]
-        return int(alt)
+        return text_size(self.font, self.text)[1]
 
     @property
     def text_width(self) -> int:
         """Calculate width for a multiline text."""
-        alist = self.text.split("\n")
-        widths = []
-        for line in alist:
-            w = self.font.getbbox(line)[2]
-            widths.append(w)
-        return int(max(widths))
+        return text_size(self.font, self.text)[0]
 
     def create_text_image(self) -> ImPIL.Image:
-        """Create a text image."""
-        image = ImPIL.new(self.mode, (self.text_width, self.text_height), self.background_hex)
-        draw = ImageDraw.Draw(image)
-        draw.text((0, 0), self.text, font=self.font, fill=self.text_color.hex(self.text_opacity))
-        return image
+        """Create a text image.
+
+        Equal labels are rendered once (see :func:`text_image`), each block gets its own copy.
+        """
+        text_hex = self.text_color.hex(self.text_opacity)
+        return text_image(self.font, self.text, text_hex, self.background_hex, self.mode).copy()
@@ -0,0 +1,260 @@
+"""Caches for the images downloaded from Earth Engine.
+
+There are 2 caches:
+
+- DiskCache: persistent cache of the downloaded (encoded) images.
+- MemoryCache: in-process cache of the decoded images.
+
+Images are identified by a key computed with :func:`make_key` from the serialized
+Earth Engine expression and the parameters used to download it, so the same
+image requested twice (even from different processes) resolves to the same key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+TMP_PREFIX = ".tmp-"
+# bits per pixel of the modes Pillow doesn't store as one byte per band: bilevel images take a byte per
+# pixel and images of 2 or 3 bands are padded to 4 bytes per pixel
+MODE_BITS = {
+    "1": 8,
+    "I;16": 16,
+    "I;16B": 16,
+    "I;16L": 16,
+    "I": 32,
+    "F": 32,
+    "LA": 32,
+    "La": 32,
+    "PA": 32,
+    "RGB": 32,
+    "YCbCr": 32,
+    "LAB": 32,
+    "HSV": 32,
+}
+
+
+def _serialize(obj: Any) -> Any:
+    """Make an object JSON serializable for the key."""
+    if hasattr(obj, "serialize"):
+        # Earth Engine objects
+        return obj.serialize()
+    return repr(obj)
+
+
+def make_key(*parts: Any) -> str:
+    """Create a cache key hashing all the parts.
+
+    Earth Engine objects are serialized, so two equal expressions produce the same key.
+
+    Args:
+        parts: the objects that identify the image.
+    """
+    data = json.dumps(parts, sort_keys=True, default=_serialize)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class DiskCache:
+    """Persistent cache of the downloaded images."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_size: int = 1024**3,
+        ttl: float | None = None,
+    ):
+        """Persistent cache of the downloaded images.
+
+        Each entry is stored in a file named after its key. Files are written atomically,
+        so many processes can share the same directory. When the total size of the cache
+        exceeds ``max_size`` the least recently used entries are removed.
+
+        Args:
+            directory: the directory to store the images. It'll be created if it doesn't exist.
+            max_size: maximum size of the cache in bytes.
+            ttl: time to live of each entry in seconds. If None entries never expire.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._size: int | None = None
+
+    def path(self, key: str) -> Path:
+        """Path of the file for the key."""
+        return self.directory / key
+
+    def get(self, key: str) -> bytes | None:
+        """Get the content stored for the key. None if it's not cached or it expired.
+
+        Args:
+            key: the key of the entry.
+        """
+        path = self.path(key)
+        try:
+            stat = path.stat()
+            if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+            # the access time is used to evict the least recently used entries
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            # it could have been evicted by another process
+            return None
+        return data
+
+    def set(self, key: str, data: bytes):
+        """Store the content for the key.
+
+        Args:
+            key: the key of the entry.
+            data: the content to store.
+        """
+        path = self.path(key)
+        try:
+            # the replaced entry doesn't count anymore
+            old_size = path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        if self._size is not None:
+            self._size += len(data) - old_size
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        """Path and stat of all the entries in the cache."""
+        stats = []
+        for path in self.directory.iterdir():
+            if path.name.startswith(TMP_PREFIX):
+                continue
+            try:
+                stats.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return stats
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits ``max_size``."""
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_atime)
+        size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
+        self._size = size
+
+    def clear(self):
+        """Remove all the entries."""
+        for path, _ in self.entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Number of bytes used by the pixels of a decoded image, as Pillow stores them in memory."""
+    bits = MODE_BITS.get(image.mode, 8 * len(image.getbands()))
+    return math.ceil(image.width * image.height * bits / 8)
+
+
+class MemoryCache:
+    """In-process cache of decoded images."""
+
+    def __init__(self, max_bytes: int = 512 * 1024**2):
+        """In-process cache of decoded images.
+
+        The size of the cache is measured by the bytes of the decoded pixels, not by the
+        number of entries. When it exceeds ``max_bytes`` the least recently used images are
+        discarded. It can be safely shared between threads.
+
+        The cached images are shared, so they must not be modified in place.
+
+        Args:
+            max_bytes: maximum number of bytes of all the images in the cache.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._images: OrderedDict[str, Image.Image] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of images in the cache."""
+        return len(self._images)
+
+    def get(self, key: str) -> Image.Image | None:
+        """Get the image stored for the key. None if it's not cached.
+
+        Args:
+            key: the key of the entry.
+        """
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def set(self, key: str, image: Image.Image):
+        """Store the image for the key.
+
+        Images bigger than ``max_bytes`` are not stored.
+
+        Args:
+            key: the key of the entry.
+            image: the decoded image.
+        """
+        nbytes = image_nbytes(image)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.nbytes -= image_nbytes(previous)
+            self._images[key] = image
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.nbytes -= image_nbytes(evicted)
+                self.evictions += 1
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit and miss statistics of the cache."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._images),
+            nbytes=self.nbytes,
+        )
+
+    def clear(self):
+        """Remove all the images and reset the statistics."""
+        with self._lock:
+            self._images.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,76 @@
+"""Canvas to paint strips and grids.
+
+The canvas can be kept in memory (default) or backed by a memory-mapped temporary
+file, so the operating system can page huge canvases out of the RAM instead of
+killing the process.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Literal
+
+from PIL import Image as ImPIL
+
+CanvasType = Literal["memory", "memmap"]
+
+# bytes per pixel of the modes that Pillow can map without copying
+MEMMAP_MODES = {"L": 1, "RGBA": 4, "CMYK": 4}
+
+
+def new_canvas(
+    mode: str,
+    size: tuple[int, int],
+    color: str | int | tuple,
+    canvas: CanvasType = "memory",
+    directory: str | Path | None = None,
+) -> ImPIL.Image:
+    """Create a canvas filled with a color.
+
+    Args:
+        mode: mode of the canvas.
+        size: size of the canvas.
+        color: color to fill the canvas with.
+        canvas: "memory" for a regular image, "memmap" for an image backed by a memory-mapped file.
+        directory: directory of the temporary file of memory-mapped canvases. If None it uses the default
+            temporary directory.
+    """
+    if canvas == "memory":
+        return ImPIL.new(mode, size, color)
+    if canvas == "memmap":
+        return new_memmap(mode, size, color, directory)
+    raise ValueError(f"Canvas '{canvas}' not in {['memory', 'memmap']}")
+
+
+def new_memmap(
+    mode: str,
+    size: tuple[int, int],
+    color: str | int | tuple,
+    directory: str | Path | None = None,
+) -> ImPIL.Image:
+    """Create an image backed by a memory-mapped temporary file.
+
+    The pixels of the image are the mapped file (no copy), so pasting on it writes directly
+    in the mapped region. The file is removed when the image is discarded.
+
+    Args:
+        mode: mode of the canvas. One of L, RGBA or CMYK.
+        size: size of the canvas.
+        color: color to fill the canvas with.
+        directory: directory of the temporary file. If None it uses the default temporary directory.
+    """
+    import numpy
+
+    if mode not in MEMMAP_MODES:
+        raise ValueError(f"Mode '{mode}' can't be memory-mapped, use one of {list(MEMMAP_MODES)}")
+    width, height = size
+    if width == 0 or height == 0:
+        return ImPIL.new(mode, size, color)
+    shape = (height, width, MEMMAP_MODES[mode])
+    buffer = numpy.memmap(tempfile.TemporaryFile(dir=directory), numpy.uint8, "w+", shape=shape)
+    image = ImPIL.frombuffer(mode, size, buffer, "raw", mode, 0, 1)
+    # the mapped file is writable, Pillow must paint on it instead of copying it on first write
+    image.readonly = 0
+    image.paste(color, (0, 0, width, height))
+    return image
@@ -1,11 +1,27 @@
 """Module to handle colors."""
 
+from __future__ import annotations
+
 import colorsys
+from collections.abc import Iterator, Sequence
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy
+
+
+@lru_cache(maxsize=1024)
+def hex_string(red: int, green: int, blue: int, alpha: int = 255) -> str:
+    """Hex string (#RRGGBBAA) of a color. Cached, colors are formatted many times while rendering."""
+    return f"#{red:02X}{green:02X}{blue:02X}{alpha:02X}"
 
 
 class Color:
     """Base class for color."""
 
+    __slots__ = ("blue", "green", "red")
+
     def __init__(self, red: int, green: int, blue: int):
         """Color class to handle colors."""
         if red < 0 or red > 255:
@@ -44,10 +60,7 @@ class Color:
         """Hex string of the color."""
         if opacity > 1 or opacity < 0:
             raise ValueError(f"Opacity must be between 0 and 1, found {opacity}")
-        # Convert alpha to hexadecimal
-        alpha_hex = f"{int(opacity * 255):02X}"
-        hex_color = f"#{self.red:02X}{self.green:02X}{self.blue:02X}{alpha_hex}"
-        return hex_color
+        return hex_string(self.red, self.green, self.blue, int(opacity * 255))
 
     def rgb(self) -> tuple:
         """RGB of the color."""
@@ -99,3 +112,172 @@ def create(color: str | list | Color) -> Color:
     if isinstance(color, Color):
         return color
     raise ValueError(f"Color '{color}' not recognized")
+
+
+class Palette:
+    """An array of colors.
+
+    Colors are stored in a NumPy array, so converting and interpolating thousands of them
+    doesn't need a :class:`Color` instance for each one.
+    """
+
+    __slots__ = ("rgb",)
+
+    def __init__(self, rgb: numpy.ndarray | Sequence):
+        """An array of colors.
+
+        Args:
+            rgb: RGB values of the colors, with shape (n, 3) and values between 0 and 255.
+        """
+        import numpy
+
+        array = numpy.asarray(rgb)
+        if array.ndim != 2 or array.shape[1] != 3:
+            raise ValueError(f"RGB values must have shape (n, 3), found {array.shape}")
+        if array.size and (array.min() < 0 or array.max() > 255):
+            raise ValueError("RGB values must be between 0 and 255.")
+        self.rgb = array.astype(numpy.uint8)
+
+    def __repr__(self):
+        """String representation of the palette."""
+        return f"Palette({self.hex()})"
+
+    def __len__(self) -> int:
+        """Number of colors of the palette."""
+        return len(self.rgb)
+
+    def __iter__(self) -> Iterator[Color]:
+        """Iterate over the colors of the palette."""
+        for red, green, blue in self.rgb.tolist():
+            yield Color(red, green, blue)
+
+    def __getitem__(self, index: int | slice) -> Color | Palette:
+        """A color of the palette, or a palette if index is a slice."""
+        if isinstance(index, slice):
+            return Palette(self.rgb[index])
+        return Color(*self.rgb[index].tolist())
+
+    def __eq__(self, other: object) -> bool:
+        """Palettes are equal if they have the same colors."""
+        if not isinstance(other, Palette):
+            return NotImplemented
+        return self.rgb.shape == other.rgb.shape and bool((self.rgb == other.rgb).all())
+
+    @classmethod
+    def from_colors(cls, colors: Sequence[str | list | Color]) -> Palette:
+        """Create a palette from a list of colors (see :func:`create`)."""
+        if not colors:
+            raise ValueError("The palette must have at least one color.")
+        return cls([create(color).rgb() for color in colors])
+
+    @classmethod
+    def from_hex(cls, hex_colors: Sequence[str]) -> Palette:
+        """Create a palette from hex strings (RRGGBB, with or without # and alpha)."""
+        import numpy
+
+        try:
+            data = bytes.fromhex("".join(color.lstrip("#")[0:6] for color in hex_colors))
+        except ValueError:
+            raise ValueError("Colors must be hex strings like '#RRGGBB'.") from None
+        if len(data) != 3 * len(hex_colors):
+            raise ValueError("Colors must be hex strings like '#RRGGBB'.")
+        return cls(numpy.frombuffer(data, numpy.uint8).reshape(-1, 3))
+
+    @classmethod
+    def from_hsv(cls, hsv: numpy.ndarray | Sequence) -> Palette:
+        """Create a palette from HSV values.
+
+        The values are converted as :meth:`Color.from_hsv` does.
+
+        Args:
+            hsv: HSV values with shape (n, 3). Hue in degrees, saturation and value between 0 and 1.
+        """
+        import numpy
+
+        hsv = numpy.asarray(hsv, dtype=float).reshape(-1, 3)
+        hue, saturation, value = hsv[:, 0] / 360, hsv[:, 1], hsv[:, 2]
+        sector = numpy.floor(hue * 6)
+        fraction = hue * 6 - sector
+        p = value * (1 - saturation)
+        q = value * (1 - saturation * fraction)
+        t = value * (1 - saturation * (1 - fraction))
+        sector = sector.astype(int) % 6
+        # same cases than colorsys.hsv_to_rgb, one row per sector
+        red = numpy.choose(sector, [value, q, p, p, t, value])
+        green = numpy.choose(sector, [t, value, value, q, p, p])
+        blue = numpy.choose(sector, [p, p, t, value, value, q])
+        rgb = numpy.stack([red, green, blue], axis=1)
+        rgb[saturation == 0] = value[saturation == 0, None]
+        return cls((rgb * 255).astype(int))
+
+    def hex(self, opacity: float = 1.0) -> list[str]:
+        """Hex strings of the colors."""
+        if opacity > 1 or opacity < 0:
+            raise ValueError(f"Opacity must be between 0 and 1, found {opacity}")
+        data = self.rgb.tobytes().hex().upper()
+        alpha_hex = f"{int(opacity * 255):02X}"
+        return [f"#{data[i : i + 6]}{alpha_hex}" for i in range(0, len(data), 6)]
+
+    def hsv(self) -> numpy.ndarray:
+        """Hue, Saturation and Value of the colors, with shape (n, 3) and values between 0 and 1."""
+        import numpy
+
+        rgb = self.rgb / 255
+        value = rgb.max(axis=1)
+        delta = value - rgb.min(axis=1)
+        saturation = numpy.divide(delta, value, out=numpy.zeros_like(value), where=value > 0)
+        safe_delta = numpy.where(delta > 0, delta, 1)
+        red, green, blue = ((value[:, None] - rgb) / safe_delta[:, None]).T
+        hue = numpy.select(
+            [rgb[:, 0] == value, rgb[:, 1] == value],
+            [blue - green, 2 + red - blue],
+            4 + green - red,
+        )
+        hue = numpy.where(delta > 0, (hue / 6) % 1, 0)
+        return numpy.stack([hue, saturation, value], axis=1)
+
+    def interpolate(self, n: int, stops: Sequence[float] | None = None) -> Palette:
+        """Interpolate linearly n colors along the palette.
+
+        Args:
+            n: number of colors of the new palette.
+            stops: position of each color of the palette, increasing from 0 to 1. If None the colors are
+                evenly spaced.
+        """
+        import numpy
+
+        if not len(self):
+            raise ValueError("The palette must have at least one color.")
+        if stops is not None and len(stops) != len(self):
+            raise ValueError(f"Expected {len(self)} stops, found {len(stops)}")
+        positions = numpy.linspace(0, 1, n)
+        points = numpy.linspace(0, 1, len(self)) if stops is None else numpy.asarray(stops, float)
+        lut = [numpy.interp(positions, points, self.rgb[:, i]) for i in range(3)]
+        return Palette(numpy.rint(numpy.stack(lut, axis=1)))
+
+    def lut(self, stops: Sequence[float] | None = None) -> numpy.ndarray:
+        """Lookup table of 256 colors interpolated along the palette, with shape (256, 3)."""
+        return self.interpolate(256, stops).rgb
+
+    def putpalette_data(self, stops: Sequence[float] | None = None) -> bytes:
+        """The lookup table as data for ``Image.putpalette`` (RGB raw mode)."""
+        return self.lut(stops).tobytes()
+
+    def point_table(self, stops: Sequence[float] | None = None) -> list[int]:
+        """The lookup table as a table for ``Image.point`` of an RGB image (band by band)."""
+        return self.lut(stops).T.ravel().tolist()
+
+
+def palette_lut(palette: list, n: int = 256) -> numpy.ndarray:
+    """Lookup table of colors interpolated along a palette.
+
+    The colors are linearly interpolated between the colors of the palette, as Earth Engine does.
+
+    Args:
+        palette: a list of colors (see :func:`create`).
+        n: number of colors of the table.
+
+    Returns:
+        an array of shape (n, 3) with the RGB values of the colors.
+    """
+    return Palette.from_colors(palette).interpolate(n).rgb
@@ -0,0 +1,286 @@
+"""Flattened rendering of nested blocks.
+
+Rendering a block the usual way (``block.image``) creates the image of every
+nested strip and grid, pastes it in a new background and so on up to the top
+block. This module flattens the tree of blocks into the absolute position of each
+background and leaf element, and paints all of them straight into one canvas.
+
+Nested strips and grids are flattened only when their image would be pasted
+unchanged in the parent (not resized, not cropped and with the same mode).
+Otherwise their image is rendered and painted as any other leaf.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, Literal, NamedTuple
+
+from PIL import Image as ImPIL
+
+from geepillow.blocks import Block, ImageBlock
+from geepillow.canvas import CanvasType, new_canvas
+
+BoxType = tuple[int, int, int, int]
+PlacementKind = Literal["background", "element", "image"]
+
+# PNG color type and bytes per pixel of each supported mode
+PNG_MODES = {"L": (0, 1), "LA": (4, 2), "RGB": (2, 3), "RGBA": (6, 4)}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class Placement(NamedTuple):
+    """Something to paint in the canvas.
+
+    - background: fill the box with the background color of the block.
+    - element: paste the element of the block in the box.
+    - image: paste the image of the block in the box.
+
+    The paint never exceeds the clip box.
+    """
+
+    kind: PlacementKind
+    block: Block
+    box: BoxType
+    clip: BoxType
+
+
+def intersection(box: BoxType, other: BoxType) -> BoxType | None:
+    """Intersection of two boxes (left, upper, right, lower). None if they don't intersect."""
+    left, upper = max(box[0], other[0]), max(box[1], other[1])
+    right, lower = min(box[2], other[2]), min(box[3], other[3])
+    if left >= right or upper >= lower:
+        return None
+    return left, upper, right, lower
+
+
+def walk(block: Block) -> Iterator[Block]:
+    """Iterate over the block and all its nested blocks, without rendering or loading them."""
+    yield block
+    positions = getattr(block, "block_positions", None)
+    if positions is not None:
+        for child, _ in positions():
+            yield from walk(child)
+
+
+def flatten(
+    block: Block, origin: tuple[int, int] = (0, 0), mode: str | None = None
+) -> Iterator[Placement]:
+    """Flatten a block into the placements to paint, in painting order.
+
+    Args:
+        block: the block to flatten.
+        origin: absolute position (X,Y) of the top-left corner of the block.
+        mode: mode of the canvas. If None it's the mode of the block.
+    """
+    mode = mode or block.mode
+    x, y = origin
+    box = (x, y, x + int(block.width), y + int(block.height))
+    if block.mode != mode:
+        # the image must be converted as a whole to match the nested rendering
+        yield Placement("image", block, box, box)
+        return
+    yield Placement("background", block, box, box)
+    if not isinstance(block, ImageBlock):
+        return
+    element_x, element_y = block.xy
+    element_width, element_height = block.element_size
+    element_box = (
+        x + int(element_x),
+        y + int(element_y),
+        x + int(element_x) + element_width,
+        y + int(element_y) + element_height,
+    )
+    positions = getattr(block, "block_positions", None)
+    is_inside = intersection(element_box, box) == element_box
+    if positions is not None and is_inside and block.element_size == block.source_size:
+        for child, (child_x, child_y) in positions():
+            yield from flatten(child, (element_box[0] + child_x, element_box[1] + child_y), mode)
+    else:
+        yield Placement("element", block, element_box, box)
+
+
+def paint(canvas: ImPIL.Image, placement: Placement, offset: tuple[int, int] = (0, 0)):
+    """Paint a placement in the canvas.
+
+    Args:
+        canvas: the canvas to paint in.
+        placement: what to paint.
+        offset: absolute position (X,Y) of the top-left corner of the canvas. Useful to paint
+            a part of the whole image.
+    """
+    canvas_box = (offset[0], offset[1], offset[0] + canvas.width, offset[1] + canvas.height)
+    region = intersection(placement.box, placement.clip)
+    region = intersection(region, canvas_box) if region is not None else None
+    if region is None:
+        return
+    target = (
+        region[0] - offset[0],
+        region[1] - offset[1],
+        region[2] - offset[0],
+        region[3] - offset[1],
+    )
+    if placement.kind == "background":
+        canvas.paste(placement.block.background_hex, target)
+        return
+    block = placement.block
+    if placement.kind == "element" and isinstance(block, ImageBlock):
+        image = block.element
+    else:
+        image = block.image
+    if region != placement.box:
+        left, upper = placement.box[:2]
+        image = image.crop(
+            (region[0] - left, region[1] - upper, region[2] - left, region[3] - upper)
+        )
+    canvas.paste(image, target[:2])
+
+
+def render(block: Block, canvas_type: CanvasType = "memory") -> ImPIL.Image:
+    """Render the block painting all the nested blocks in a single canvas.
+
+    The result is the same as ``block.image`` without creating the images of the nested strips and grids.
+
+    Args:
+        block: the block to render.
+        canvas_type: "memory" or "memmap". See :mod:`geepillow.canvas`.
+    """
+    size = (int(block.width), int(block.height))
+    canvas = new_canvas(block.mode, size, 0, canvas_type)
+    for placement in flatten(block):
+        paint(canvas, placement)
+    return canvas
+
+
+def check_png_mode(mode: str):
+    """Raise an error if the mode can't be written in a PNG stream."""
+    if mode not in PNG_MODES:
+        raise ValueError(f"Mode '{mode}' can't be streamed as PNG, use one of {list(PNG_MODES)}")
+
+
+class PNGStream:
+    """Write a PNG file band by band.
+
+    Only the compressed data is kept in memory, so the size of the image is not limited by the memory.
+    """
+
+    def __init__(self, file: BinaryIO, size: tuple[int, int], mode: str, compress_level: int = 6):
+        """Write a PNG file band by band.
+
+        Args:
+            file: a binary file opened for writing.
+            size: size of the whole image.
+            mode: mode of the image. One of L, LA, RGB or RGBA.
+            compress_level: zlib compression level, from 0 (no compression) to 9.
+        """
+        check_png_mode(mode)
+        self.file = file
+        self.size = size
+        self.mode = mode
+        self.rows = 0
+        self._compressor = zlib.compressobj(compress_level)
+        color_type, _ = PNG_MODES[mode]
+        header = struct.pack(">IIBBBBB", size[0], size[1], 8, color_type, 0, 0, 0)
+        self.file.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", header)
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        """Write a PNG chunk."""
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type + data)
+        self.file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+    def write(self, band: ImPIL.Image):
+        """Write the next band of rows.
+
+        Args:
+            band: an image as wide as the whole image and with the same mode.
+        """
+        if band.mode != self.mode or band.width != self.size[0]:
+            raise ValueError("The band must have the same mode and width of the image.")
+        if self.rows + band.height > self.size[1]:
+            raise ValueError("The band exceeds the height of the image.")
+        _, bytes_per_pixel = PNG_MODES[self.mode]
+        stride = band.width * bytes_per_pixel
+        raw = band.tobytes()
+        # every row starts with the filter type (0: no filter)
+        data = b"".join(b"\x00" + raw[i : i + stride] for i in range(0, len(raw), stride))
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._write_chunk(b"IDAT", compressed)
+        self.rows += band.height
+
+    def close(self):
+        """Finish the PNG file."""
+        if self.rows != self.size[1]:
+            raise ValueError(f"Only {self.rows} of {self.size[1]} rows were written.")
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+
+def render_bands(block: Block, band_height: int = 1024) -> Iterator[ImPIL.Image]:
+    """Render the block in horizontal bands, from top to bottom.
+
+    Only one band is kept in memory at a time, besides the elements of the blocks painted in it. The
+    images of each block are released after the last band it's painted in: the rendered images are
+    discarded, and so are the original images that were loaded while rendering (see
+    :meth:`geepillow.blocks.ImageBlock.unload`).
+
+    Args:
+        block: the block to render.
+        band_height: height of each band in pixels. The last band can be smaller.
+    """
+    width, height = int(block.width), int(block.height)
+    # flattening can load the blocks that don't know their size without loading their image
+    was_loaded = {id(child): getattr(child, "loaded", True) for child in walk(block)}
+    placements = list(flatten(block))
+    # blocks released after each band, a block can be painted by many placements
+    last_band: dict[int, int] = {}
+    painted: dict[int, Block] = {}
+    for placement in placements:
+        if placement.kind == "background":
+            continue
+        lower = min(placement.box[3], placement.clip[3], height)
+        key = id(placement.block)
+        last_band[key] = max(last_band.get(key, 0), max(lower - 1, 0) // band_height)
+        painted[key] = placement.block
+    releases: dict[int, list[Block]] = {}
+    for key, band_index in last_band.items():
+        releases.setdefault(band_index, []).append(painted[key])
+    for band_index, upper in enumerate(range(0, height, band_height)):
+        lower = min(upper + band_height, height)
+        band = ImPIL.new(block.mode, (width, lower - upper))
+        for placement in placements:
+            if placement.box[1] < lower and placement.box[3] > upper:
+                paint(band, placement, offset=(0, upper))
+        for child in releases.get(band_index, []):
+            if isinstance(child, ImageBlock) and not was_loaded.get(id(child), True):
+                child.unload()
+            else:
+                child.invalidate()
+        yield band
+
+
+def render_to_file(
+    block: Block, filename: str | Path, band_height: int = 1024, compress_level: int = 6
+):
+    """Render the block to a PNG file with bounded memory.
+
+    The image is rendered and written in horizontal bands, so the memory needed depends on the size of the
+    band and not on the size of the whole image.
+
+    Args:
+        block: the block to render.
+        filename: path of the PNG file.
+        band_height: height of each band in pixels.
+        compress_level: zlib compression level, from 0 (no compression) to 9.
+    """
+    check_png_mode(block.mode)
+    size = (int(block.width), int(block.height))
+    with open(filename, "wb") as file:
+        stream = PNGStream(file, size, block.mode, compress_level)
+        for band in render_bands(block, band_height):
+            stream.write(band)
+        stream.close()
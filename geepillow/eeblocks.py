@@ -3,23 +3,53 @@
 from __future__ import annotations
 
 import math
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-import ee
-import geetools  # noqa: F401
+from PIL import Image as ImPIL
 
 from geepillow import fonts
 from geepillow.blocks import DEFAULT_MODE, Block, FontType, ImageBlock, PositionType, TextBlock
+from geepillow.cache import DiskCache, MemoryCache, make_key
+from geepillow.canvas import CanvasType
 from geepillow.colors import Color
 from geepillow.grids import Grid
-from geepillow.image import from_eeimage
+from geepillow.image import (
+    BackendType,
+    apply_palette,
+    fetch_band,
+    from_eecollection,
+    from_eeimage,
+)
+from geepillow.transport import Transport
+
+if TYPE_CHECKING:
+    import ee
+    import numpy
+    from PIL.ImageFont import FreeTypeFont
 
 logger = getLogger(__name__)
 
 TextPositionType = Literal["top", "bottom"]
+FetchModeType = Literal["image", "filmstrip"]
+PaletteModeType = Literal["server", "client"]
+
+DEFAULT_MAX_WORKERS = 8
+LABEL_PROPERTY = "geepillow:label"
+
 
-DEFAULT_GRID_FONT = fonts.opensans_bold(24)
+def default_grid_font() -> FreeTypeFont:
+    """Font of the labels of the grids if none is given. It's loaded on first use."""
+    return fonts.opensans_bold(24)
+
+
+def __getattr__(name: str) -> Any:
+    """Load DEFAULT_GRID_FONT on first access instead of when importing the module."""
+    if name == "DEFAULT_GRID_FONT":
+        return default_grid_font()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class EEImageBlock(ImageBlock):
@@ -42,11 +72,25 @@ class EEImageBlock(ImageBlock):
         background_color: str | Color = "white",
         background_opacity: float = 1,
         mode: str = DEFAULT_MODE,
+        transport: Transport | None = None,
+        cache: DiskCache | None = None,
+        memory_cache: MemoryCache | None = None,
+        lazy: bool = False,
+        palette_mode: PaletteModeType = "server",
+        backend: BackendType = "thumbnail",
     ):
         """EEImageBlock.
 
         By default, the size of the image matches the size of the block.
 
+        If lazy, the image is not requested when the block is created, but on first access to it
+        (``image``, ``element``, ``source``) or when calling :func:`prefetch` with many blocks.
+
+        With palette_mode "client", the values of the band are requested once and min, max and palette
+        are applied locally (see :func:`geepillow.image.apply_palette`), so the block can be restyled
+        with :meth:`restyle` without requesting the image again. Only for single-band images without
+        overlay.
+
         Args:
             ee_image: Earth Engine image.
             viz_params: Visualization parameters.
@@ -65,7 +109,27 @@ class EEImageBlock(ImageBlock):
             background_color: color of the background.
             background_opacity: opacity of the background.
             mode: mode of the background image
+            transport: the transport used to download the image. If None it'll use the default transport.
+            cache: a cache to store the downloaded image. If the image is already cached, it won't be requested
+                to Earth Engine.
+            memory_cache: an in-process cache of decoded images. Cached images won't be requested or decoded
+                again.
+            lazy: if True the image is requested on first access instead of when creating the block.
+            palette_mode: "server" to visualize the image in Earth Engine, "client" to visualize it locally.
+            backend: "thumbnail" to download the image as a PNG thumbnail, "pixels" to compute its pixels
+                directly as an array. See :func:`geepillow.image.from_eeimage`.
         """
+        if palette_mode not in ("server", "client"):
+            raise ValueError(f"Palette mode '{palette_mode}' not in {['server', 'client']}")
+        if palette_mode == "client" and overlay is not None:
+            raise ValueError("An overlay can't be drawn with palette mode 'client'.")
+        if palette_mode == "client" and len((viz_params or {}).get("bands", [])) > 1:
+            raise ValueError(
+                "Only single-band images can be visualized with palette mode 'client'."
+            )
+        self.palette_mode = palette_mode
+        self.backend = backend
+        self._band: numpy.ndarray | None = None
         self.ee_image = ee_image
         self.viz_params = viz_params or dict(min=0, max=1)
         self.dimensions = dimensions
@@ -74,22 +138,15 @@ class EEImageBlock(ImageBlock):
         self.overlay_style = overlay_style
         self.style_property = style_property
         self.scale = scale
+        self.transport = transport
+        self.cache = cache
+        self.memory_cache = memory_cache
         if size is None and isinstance(dimensions, (int, float)):
             size = (dimensions, dimensions)
         elif isinstance(dimensions, (tuple, list)):
             size = dimensions
-        image = from_eeimage(
-            image=ee_image,
-            dimensions=self.dimensions,
-            viz_params=self.viz_params,
-            scale=self.scale,
-            region=self.region,
-            overlay=overlay,
-            overlay_style=overlay_style,
-            style_property=style_property,
-        )
         super(EEImageBlock, self).__init__(
-            image=image,
+            image=None if lazy else self.fetch(),
             position=position,
             fit_block=fit_block,
             keep_proportion=keep_proportion,
@@ -99,6 +156,151 @@ class EEImageBlock(ImageBlock):
             mode=mode,
         )
 
+    @property
+    def key(self) -> str:
+        """Key that identifies the image requested by this block."""
+        return make_key(
+            self.ee_image,
+            self.viz_params,
+            self.dimensions,
+            self.scale,
+            self.region,
+            self.overlay,
+            self.overlay_style,
+            self.style_property,
+            self.palette_mode,
+            self.backend,
+        )
+
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the image.
+
+        When both dimensions are given Earth Engine returns an image of that size, so it's known without
+        requesting the image (e.g. to lay out lazy blocks). Otherwise the image is requested.
+        """
+        if self._image is None and isinstance(self.dimensions, (tuple, list)):
+            width, height = self.dimensions
+            return int(width), int(height)
+        return self.source.size
+
+    @property
+    def band(self) -> numpy.ndarray:
+        """Values of the band visualized locally. Requested on first access."""
+        if self._band is None:
+            bands = self.viz_params.get("bands")
+            self._band = fetch_band(
+                image=self.ee_image,
+                dimensions=self.dimensions,
+                band=bands[0] if bands else None,
+                scale=self.scale,
+                region=self.region,
+                transport=self.transport,
+                cache=self.cache,
+            )
+        return self._band
+
+    def visualize(self) -> ImPIL.Image:
+        """Apply min, max and palette of the visualization parameters to the band."""
+        # min and max can be given per band, like in Earth Engine
+        limits = [self.viz_params.get("min", 0), self.viz_params.get("max", 1)]
+        low, high = [value[0] if isinstance(value, (list, tuple)) else value for value in limits]
+        return apply_palette(self.band, min=low, max=high, palette=self.viz_params.get("palette"))
+
+    def restyle(self, viz_params: dict):
+        """Change the visualization parameters.
+
+        With palette mode "client" the new parameters are applied to the band already fetched.
+        Otherwise the image will be requested again on next access.
+
+        Args:
+            viz_params: the new visualization parameters.
+        """
+        bands = self.viz_params.get("bands")
+        self.viz_params = viz_params
+        if (
+            self.palette_mode == "client"
+            and self._band is not None
+            and viz_params.get("bands") == bands
+        ):
+            self.set_image(self.visualize(), owned=True)
+            return
+        self._band = None
+        self._image = None
+        self.invalidate()
+
+    def fetch(self) -> ImPIL.Image:
+        """Request the image to Earth Engine."""
+        if self.palette_mode == "client":
+            return self.visualize()
+        return from_eeimage(
+            image=self.ee_image,
+            dimensions=self.dimensions,
+            viz_params=self.viz_params,
+            scale=self.scale,
+            region=self.region,
+            overlay=self.overlay,
+            overlay_style=self.overlay_style,
+            style_property=self.style_property,
+            transport=self.transport,
+            cache=self.cache,
+            memory_cache=self.memory_cache,
+            backend=self.backend,
+        )
+
+    def load(self) -> ImPIL.Image:
+        """Load the image requesting it to Earth Engine."""
+        return self.fetch()
+
+    def set_image(self, image: ImPIL.Image, owned: bool = False):
+        """Set the image of the block, converting it to the block mode.
+
+        Args:
+            image: the image fetched from Earth Engine.
+            owned: whether the image is only used by this block. Images shared with other blocks (see
+                :func:`prefetch`) are copied before being handed out as the block image.
+        """
+        self._image = image if image.mode == self.mode else image.convert(self.mode)
+        self._owns_source = owned or image.mode != self.mode
+        self.invalidate()
+
+
+def _walk(blocks: Iterable) -> Iterator[Block]:
+    """Iterate over all the blocks, including nested lists, strips and grids."""
+    for block in blocks:
+        if block is None:
+            continue
+        if isinstance(block, (list, tuple)):
+            yield from _walk(block)
+            continue
+        yield block
+        if hasattr(block, "_blocks"):
+            yield from _walk(block._blocks)
+
+
+def prefetch(blocks: Iterable, max_workers: int | None = DEFAULT_MAX_WORKERS):
+    """Fetch the images of all the lazy EEImageBlocks concurrently.
+
+    Blocks that request the same image are fetched only once.
+
+    Args:
+        blocks: the blocks. It can be a list of blocks, a list of lists (like the blocks of a grid), strips or grids.
+        max_workers: maximum number of images fetched at the same time. If None it uses the default of
+            ``concurrent.futures.ThreadPoolExecutor``.
+    """
+    pending: dict[str, list[EEImageBlock]] = {}
+    for block in _walk(blocks):
+        if isinstance(block, EEImageBlock) and not block.loaded:
+            pending.setdefault(block.key, []).append(block)
+    if not pending:
+        return
+    groups = list(pending.values())
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        images = executor.map(lambda group: group[0].fetch(), groups)
+        for group, image in zip(groups, images):
+            for block in group:
+                block.set_image(image)
+
 
 class EEImageCollectionGrid(Grid):
     """A Grid for ImageCollections."""
@@ -111,7 +313,7 @@ class EEImageCollectionGrid(Grid):
         region: ee.Geometry | ee.Feature | None = None,
         text_pattern: str | None = None,
         text_position: TextPositionType = "bottom",
-        font: str | FontType = DEFAULT_GRID_FONT,
+        font: str | FontType | None = None,
         overlay: ee.FeatureCollection | ee.Feature | ee.Geometry | None = None,
         overlay_style: dict | None = None,
         style_property: str | None = None,
@@ -130,6 +332,14 @@ class EEImageCollectionGrid(Grid):
         background_color: str | Color = "white",
         background_opacity: float = 1,
         mode: str = DEFAULT_MODE,
+        transport: Transport | None = None,
+        max_workers: int | None = DEFAULT_MAX_WORKERS,
+        cache: DiskCache | None = None,
+        memory_cache: MemoryCache | None = None,
+        fetch_mode: FetchModeType = "image",
+        canvas: CanvasType = "memory",
+        backend: BackendType = "thumbnail",
+        lazy: bool = False,
     ):
         """A grid for image collections.
 
@@ -139,6 +349,11 @@ class EEImageCollectionGrid(Grid):
         using the number of images. Same the other way around. If both are None, n_columns
         will be set to 3.
 
+        The images are requested concurrently when the grid is created. If lazy, each image is requested
+        when its cell is rendered instead, so rendering the grid in bands (see
+        :func:`geepillow.compositor.render_to_file`) only keeps the images of the current band in memory.
+        Call :func:`prefetch` with the grid to request all of them concurrently later.
+
         Args:
             collection: Earth Engine image collection.
             n_columns: number of columns.
@@ -149,7 +364,8 @@ class EEImageCollectionGrid(Grid):
                 Properties of the image can be used inside this text following this guide:
                 https://geetools.readthedocs.io/en/stable/autoapi/geetools/ee_string/StringAccessor.format.html
             text_position: the position of the text block.
-            font: font to use. The size the font is included in this parameter.
+            font: font to use. The size the font is included in this parameter. If None it uses
+                :func:`default_grid_font`.
             region: region of interest to "clip" each image to. If None it uses the geometry of each image.
             overlay: a feature collection to overlay on top of the image.
             overlay_style: style of the overlay.
@@ -170,6 +386,20 @@ class EEImageCollectionGrid(Grid):
             mode: mode of the background image
             x_space: space on the x axis.
             y_space: space on the y axis.
+            transport: the transport used to download the images. If None it'll use the default transport.
+            max_workers: maximum number of images fetched at the same time. If None it uses the default of
+                ``concurrent.futures.ThreadPoolExecutor``.
+            cache: a cache to store the downloaded images. Cached images won't be requested to Earth Engine.
+            memory_cache: an in-process cache of decoded images. Cached images won't be requested or decoded
+                again.
+            fetch_mode: how the images are requested to Earth Engine. "image" requests each image separately.
+                "filmstrip" requests all the images in a single filmstrip that is split locally. Filmstrips need
+                a region shared by all the images; without it each image is requested separately.
+            canvas: "memory" to create the grid image in memory, "memmap" to create it in a memory-mapped
+                temporary file. See :mod:`geepillow.canvas`.
+            backend: how the images requested separately are fetched, "thumbnail" or "pixels".
+                See :class:`EEImageBlock`.
+            lazy: if True the images requested separately are not requested when creating the grid.
         """
         self.collection = collection
         if n_columns is None and n_rows is None and image_dimensions is None:
@@ -185,17 +415,28 @@ class EEImageCollectionGrid(Grid):
         self.overlay = overlay
         self.overlay_style = overlay_style
         self.style_property = style_property
+        self.transport = transport
+        self.max_workers = max_workers
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.fetch_mode = fetch_mode
+        self.backend = backend
+        self.lazy = lazy
         self.text_pattern = text_pattern
         self.text_position = text_position
         self.image_position = image_position
         self.text_inner_position = text_inner_position
-        self.font = font
+        self.font = font if font is not None else default_grid_font()
         self.x_space = x_space
         self.y_space = y_space
         self._image_dimensions = image_dimensions
         self._n_rows = n_rows
         self._n_columns = n_columns
-        self._image_ids = None
+        self._image_ids: list[str] | None = None
+        self._image_labels: list[str] | None = None
+        self._image_list: ee.List | None = None
+        # the blocks of the cells are created in the mode of the grid
+        self.mode = mode
 
         blocks = self.make_blocks()
         super().__init__(
@@ -209,14 +450,60 @@ class EEImageCollectionGrid(Grid):
             background_color=background_color,
             background_opacity=background_opacity,
             mode=mode,
+            canvas=canvas,
         )
 
     @property
-    def image_ids(self):
+    def image_ids(self) -> list[str]:
         """Ids of all the images in the collection."""
         if self._image_ids is None:
-            self._image_ids = self.collection.aggregate_array("system:index").getInfo()
-        return self._image_ids
+            self.fetch_info()
+        return self._image_ids  # type: ignore[return-value]
+
+    @property
+    def image_labels(self) -> list[str] | None:
+        """Text of each image using the text pattern. None if there is no text pattern."""
+        if self.text_pattern is None:
+            return None
+        if self._image_labels is None:
+            self.fetch_info()
+        return self._image_labels
+
+    @property
+    def image_list(self) -> ee.List:
+        """Server-side list of the images in the same order as the image ids."""
+        if self._image_list is None:
+            self._image_list = self.collection.toList(len(self.image_ids))
+        return self._image_list
+
+    def get_image(self, index: int) -> ee.Image:
+        """Get the image in the given position of the collection.
+
+        Args:
+            index: position of the image in the collection.
+        """
+        import ee
+
+        return ee.Image(self.image_list.get(index))
+
+    def fetch_info(self):
+        """Fetch the ids and the labels of all the images in a single request."""
+        import ee
+        import geetools  # noqa: F401 (adds the geetools accessor to ee objects)
+
+        info = {"ids": self.collection.aggregate_array("system:index")}
+        if self.text_pattern is not None:
+            pattern = ee.String(self.text_pattern)
+
+            def label(image):
+                # all properties on the server-side
+                properties = image.toDictionary(image.propertyNames())
+                return image.set(LABEL_PROPERTY, pattern.geetools.format(properties))
+
+            info["labels"] = self.collection.map(label).aggregate_array(LABEL_PROPERTY)
+        result = ee.Dictionary(info).getInfo()
+        self._image_ids = result["ids"]
+        self._image_labels = result.get("labels")
 
     @property
     def image_dimensions(self):
@@ -268,11 +555,30 @@ class EEImageCollectionGrid(Grid):
             n_rows += 1
         return n_rows
 
-    def make_image_block(self, image: ee.Image) -> Block:
-        """Make the block for the image and text block if needed."""
-        from geepillow.strips import Strip
+    def make_image_block(
+        self, image: ee.Image, text: str | None = None, thumbnail: ImPIL.Image | None = None
+    ) -> Block:
+        """Make the block for the image and text block if needed.
+
+        Args:
+            image: the image of the block.
+            text: the text of the image. If None and there is a text pattern, it'll be requested to Earth Engine.
+            thumbnail: the image already fetched from Earth Engine. If None it'll be requested.
+        """
+        return self.add_text(self.make_ee_block(image, thumbnail), image, text)
+
+    def make_ee_block(self, image: ee.Image, thumbnail: ImPIL.Image | None = None) -> ImageBlock:
+        """Make the block for the image.
+
+        The image is not requested to Earth Engine until it's needed, see :class:`EEImageBlock`.
 
-        image_block = EEImageBlock(
+        Args:
+            image: the image of the block.
+            thumbnail: the image already fetched from Earth Engine. If None it'll be requested when needed.
+        """
+        if thumbnail is not None:
+            return ImageBlock(thumbnail, size=tuple(self.image_dimensions), mode=self.mode)
+        return EEImageBlock(
             image,
             viz_params=self.viz_params,
             dimensions=self.image_dimensions,
@@ -281,39 +587,75 @@ class EEImageCollectionGrid(Grid):
             overlay=self.overlay,
             overlay_style=self.overlay_style,
             style_property=self.style_property,
+            transport=self.transport,
+            cache=self.cache,
+            memory_cache=self.memory_cache,
+            mode=self.mode,
+            lazy=True,
+            backend=self.backend,
         )
+
+    def add_text(self, image_block: ImageBlock, image: ee.Image, text: str | None = None) -> Block:
+        """Add the text block to the image block if there is a text pattern.
+
+        Args:
+            image_block: the block of the image.
+            image: the image of the block.
+            text: the text of the image. If None and there is a text pattern, it'll be requested to Earth Engine.
+        """
+        from geepillow.strips import Strip
+
         if self.text_pattern is None:
             return image_block
 
-        # all properties on the server-side
-        properties = image.toDictionary(image.propertyNames())
-        formatted = ee.String(self.text_pattern).geetools.format(properties)
-        text = formatted.getInfo()
-        txt_block = TextBlock(text, self.text_inner_position, font=self.font)
+        if text is None:
+            import ee
+            import geetools  # noqa: F401 (adds the geetools accessor to ee objects)
+
+            # all properties on the server-side
+            properties = image.toDictionary(image.propertyNames())
+            formatted = ee.String(self.text_pattern).geetools.format(properties)
+            text = formatted.getInfo()
+        txt_block = TextBlock(text, self.text_inner_position, font=self.font, mode=self.mode)
         strip_blocks: list[Any] = (
             [txt_block, image_block] if self.text_position == "top" else [image_block, txt_block]
         )
-        return Strip(strip_blocks, self.y_space, "vertical")
-
-    def make_blocks(self) -> list[list[Block]]:
-        """Make the list of blocks for the grid."""
-        grid_blocks: list[list[Block]] = []
-        i = 0
-        while i < len(self.image_ids):
-            row: list[Block] = []
-            # detect if we are in the last row and it is not complete
-            last_row = len(grid_blocks) == self.n_rows - 1
-            if not last_row:
-                columns = range(self.n_columns)
+        return Strip(strip_blocks, self.y_space, "vertical", mode=self.mode)
+
+    def make_blocks(self) -> list[list[Block | None]]:
+        """Make the list of blocks for the grid.
+
+        The blocks are fetched concurrently but the order of the collection is kept. Lazy grids leave the
+        images requested separately to be fetched when they are rendered.
+        """
+        images = [self.get_image(i) for i in range(len(self.image_ids))]
+        labels: list[str | None] = [None] * len(images)
+        if self.image_labels is not None:
+            labels = list(self.image_labels)
+        thumbnails: list[ImPIL.Image | None] = [None] * len(images)
+        if self.fetch_mode == "filmstrip":
+            if self.region is None:
+                logger.warning("Filmstrips need a region, each image will be requested separately.")
             else:
-                columns = range(self.n_last if self.n_last > 0 else self.n_columns)
-            for _ in columns:
-                iid = self.image_ids[i]
-                eeimage = ee.Image(
-                    self.collection.filter(ee.Filter.eq("system:index", iid)).first()
+                thumbnails = list(
+                    from_eecollection(
+                        self.collection,
+                        dimensions=self.image_dimensions,
+                        viz_params=self.viz_params,
+                        scale=self.scale,
+                        region=self.region,
+                        overlay=self.overlay,
+                        overlay_style=self.overlay_style,
+                        style_property=self.style_property,
+                        n_images=len(images),
+                        transport=self.transport,
+                        cache=self.cache,
+                        memory_cache=self.memory_cache,
+                    )
                 )
-                item_block = self.make_image_block(eeimage)
-                row.append(item_block)
-                i += 1
-            grid_blocks.append(row)
-        return grid_blocks
+        image_blocks = list(map(self.make_ee_block, images, thumbnails))
+        if not self.lazy:
+            prefetch(image_blocks, max_workers=self.max_workers)
+        item_blocks: list[Block | None] = list(map(self.add_text, image_blocks, images, labels))
+        n_columns = self.n_columns
+        return [item_blocks[i : i + n_columns] for i in range(0, len(item_blocks), n_columns)]
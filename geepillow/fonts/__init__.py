@@ -1,57 +1,165 @@
-"""Fonts module."""
+"""Fonts module.
 
-import sys
-from functools import lru_cache
+Fonts are created through a :class:`FontRegistry`, that loads the bytes of each font file once and
+creates the fonts of every size from them. Fonts downloaded from a URL are stored in a local cache
+directory, so they are downloaded only once.
+"""
 
-from PIL import ImageFont as fontmodule
-from PIL.ImageFont import FreeTypeFont, ImageFont, TransposedFont
-
-if sys.version_info[0] > 2:
-    import urllib.request as urllib2
-else:
-    import urllib2
+from __future__ import annotations
 
 import io
+import threading
+import weakref
+from collections import OrderedDict
+from importlib.resources import files
 from pathlib import Path
 
-if sys.version_info > (3, 7):
-    from importlib.resources import open_binary
-else:
-    from pkg_resources import resources_stream as open_binary
+from PIL import ImageFont as fontmodule
+from PIL.ImageFont import FreeTypeFont, ImageFont, TransposedFont
+
+from geepillow.cache import DiskCache, make_key
 
 URL_FONT = "http://db.onlinewebfonts.com/t/8050e6017c3b848b20a6324507cfba88.ttf"
+FONT_CACHE_DIR = Path.home() / ".cache" / "geepillow" / "fonts"
+MAX_FONTS = 128
+
+SourceType = str | Path
 
 
 def load_data(filename: Path):
     """Load binary data from filename."""
     if filename.is_absolute():
-        with open(filename, "b") as thefile:
+        with open(filename, "rb") as thefile:
             return thefile.read()
     else:
-        with open_binary(__name__, filename.as_posix()) as thefile:
-            return thefile.read()
+        return files(__name__).joinpath(filename.as_posix()).read_bytes()
+
+
+class FontRegistry:
+    """Fonts created from files loaded once."""
+
+    def __init__(self, cache_dir: str | Path | None = FONT_CACHE_DIR, max_fonts: int = MAX_FONTS):
+        """Fonts created from files loaded once.
+
+        The bytes of each font file are read once and shared by the fonts of all sizes. The last
+        ``max_fonts`` fonts (file and size) used are kept, so each of them is created once. It can be
+        safely shared between threads.
+
+        Args:
+            cache_dir: directory to store the fonts downloaded from a URL. If None they are downloaded
+                every time the process starts.
+            max_fonts: maximum number of fonts kept. The least recently used are discarded first.
+        """
+        self.cache_dir = cache_dir
+        self.max_fonts = max_fonts
+        self._data: dict[str, bytes] = {}
+        self._fonts: OrderedDict[tuple[str, float], FreeTypeFont] = OrderedDict()
+        # source of each font created by the registry while the font is alive, even if it was discarded
+        self._sources: weakref.WeakKeyDictionary[FreeTypeFont, str] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source: SourceType) -> str:
+        """Normalized source, so the same file given as a string or a path is loaded once.
+
+        Args:
+            source: a URL, the absolute path of a file or the path of a file relative to the package fonts.
+        """
+        if isinstance(source, str) and source.startswith(("http://", "https://")):
+            return source
+        return str(Path(source))
+
+    def __len__(self) -> int:
+        """Number of fonts created."""
+        return len(self._fonts)
+
+    def data(self, source: SourceType) -> bytes:
+        """Bytes of a font file. They are loaded once.
+
+        Args:
+            source: a URL, the absolute path of a file or the path of a file relative to the package fonts.
+        """
+        source = self.key(source)
+        data = self._data.get(source)
+        if data is None:
+            if source.startswith(("http://", "https://")):
+                data = self.download(source)
+            else:
+                data = load_data(Path(source))
+            with self._lock:
+                data = self._data.setdefault(source, data)
+        return data
+
+    def download(self, url: str) -> bytes:
+        """Download a font file, using the cache directory if it's set.
+
+        Args:
+            url: the URL of the font file.
+        """
+        import urllib.request
+
+        cache = DiskCache(self.cache_dir) if self.cache_dir is not None else None
+        key = make_key(url)
+        data = cache.get(key) if cache is not None else None
+        if data is None:
+            with urllib.request.urlopen(url) as response:
+                data = response.read()
+            if cache is not None:
+                cache.set(key, data)
+        return data
+
+    def font(self, source: SourceType, size: float) -> FreeTypeFont:
+        """Font of a file at the given size.
+
+        Args:
+            source: a URL, the absolute path of a file or the path of a file relative to the package fonts.
+            size: size of the font.
+        """
+        source = self.key(source)
+        with self._lock:
+            font = self._fonts.get((source, size))
+            if font is not None:
+                self._fonts.move_to_end((source, size))
+                return font
+        font_file = io.BytesIO(self.data(source))
+        font = fontmodule.truetype(font_file, size)
+        # the font is loaded again from the file when it's unpickled (e.g. in other processes)
+        font_file.seek(0)
+        with self._lock:
+            font = self._fonts.setdefault((source, size), font)
+            self._sources[font] = source
+            while len(self._fonts) > self.max_fonts:
+                self._fonts.popitem(last=False)
+        return font
+
+    def source(self, font: ImageFont | FreeTypeFont | TransposedFont) -> str | None:
+        """Source of a font created by the registry. None for other fonts.
+
+        Args:
+            font: the font.
+        """
+        if not isinstance(font, FreeTypeFont):
+            return None
+        return self._sources.get(font)
+
+
+registry = FontRegistry()
 
 
-@lru_cache(maxsize=128)
 def load_ttf(filename: Path, size: float) -> FreeTypeFont:
     """Load a Font from a file.
 
     Args:
         filename: path of the font. If absolute path it will load it directly,
             if relative it will load one of the available in the package.
-        size: size of the
+        size: size of the font.
     """
-    bdata = load_data(filename)
-    font_file = io.BytesIO(bdata)
-    return fontmodule.truetype(font_file, size)
+    return registry.font(filename, size)
 
 
-@lru_cache(maxsize=128)
 def provided(size) -> FreeTypeFont:
     """Get font from URL."""
-    b = urllib2.urlopen(URL_FONT)
-    font_file = io.BytesIO(b.read())
-    return fontmodule.truetype(font_file, size)
+    return registry.font(URL_FONT, size)
 
 
 def opensans_bold(size: int) -> FreeTypeFont:
@@ -79,15 +187,20 @@ def opensans_regular(size: int) -> FreeTypeFont:
     return load_ttf(Path("OpenSans-Regular.ttf"), size)
 
 
-def create(font: str | ImageFont | Path, size: float) -> ImageFont | FreeTypeFont | TransposedFont:
+def create(
+    font: str | Path | ImageFont | FreeTypeFont | TransposedFont, size: float
+) -> ImageFont | FreeTypeFont | TransposedFont:
     """Create a font."""
     if isinstance(font, str):
         if not font.endswith(".ttf"):
             font = f"{font}.ttf"
         return load_ttf(Path(font), size)
     if isinstance(font, (ImageFont, FreeTypeFont, TransposedFont)):
-        if hasattr(font, "path") and hasattr(font, "size") and font.path and font.size != size:
-            return load_ttf(Path(font.path), size)
+        if isinstance(font, FreeTypeFont) and font.size != size:
+            source = registry.source(font)
+            if source is not None:
+                return registry.font(source, size)
+            return font.font_variant(size=size)
         return font
     if isinstance(font, Path):
         return load_ttf(font, size)
@@ -1,21 +1,63 @@
 """A gris is just a nested strip."""
 
 import logging
+from bisect import bisect_right
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import NamedTuple
 
 from PIL import Image as ImPIL
 
 from geepillow import colors
 from geepillow.blocks import DEFAULT_MODE, Block, ImageBlock, PositionType
+from geepillow.canvas import CanvasType, new_canvas
 
 logger = logging.getLogger(__name__)
 
+BoxType = tuple[int, int, int, int]
+
+
+class GridLayout(NamedTuple):
+    """Sizes and offsets of the rows and columns of a grid."""
+
+    row_heights: list[int]
+    column_widths: list[int]
+    x_offsets: list[int]
+    y_offsets: list[int]
+
+
+def moved_spans(
+    offset: int, old_size: int, new_size: int, old_total: int
+) -> list[tuple[int, int, int]]:
+    """Spans (old start, new start, length) of the parts before, inside and after a row or column that was resized.
+
+    The part inside is as long as the smallest size, so it only contains what fits in both.
+
+    Args:
+        offset: start of the row or column.
+        old_size: previous size of the row or column.
+        new_size: current size of the row or column.
+        old_total: previous size of the whole grid.
+    """
+    return [
+        (0, 0, offset),
+        (offset, offset, min(old_size, new_size)),
+        (offset + old_size, offset + new_size, old_total - offset - old_size),
+    ]
+
 
 class Grid(ImageBlock):
     """Grid."""
 
+    # layout of the grid image, used to update it when a cell changes (see refresh)
+    _layout: GridLayout | None = None
+    # layout used by all the properties while the grid image is being rendered
+    _pinned_layout: GridLayout | None = None
+
     def __init__(
         self,
-        blocks: list[list[Block]],
+        blocks: list[list[Block | None]],
         x_space: int = 10,
         y_space: int = 10,
         position: tuple | PositionType = "center-center",
@@ -25,6 +67,8 @@ class Grid(ImageBlock):
         background_color: str | colors.Color = "white",
         background_opacity: float = 1,
         mode: str = DEFAULT_MODE,
+        canvas: CanvasType = "memory",
+        processes: int | None = 1,
     ):
         """Grid.
 
@@ -41,6 +85,10 @@ class Grid(ImageBlock):
             keep_proportion: keep proportion (ratio) of the image.
             size: size of the block (not the image).
             mode: mode of the background image.
+            canvas: "memory" to create the image in memory, "memmap" to create it in a memory-mapped temporary
+                file that the operating system can page out of the RAM. See :mod:`geepillow.canvas`.
+            processes: number of processes to render the cells. 1 renders them in the current process and None
+                uses as many processes as CPUs. See :mod:`geepillow.parallel`.
         """
         self._blocks = blocks
         self._background_color = colors.create(background_color)
@@ -48,13 +96,17 @@ class Grid(ImageBlock):
         self.y_space = y_space
         self.background_opacity = background_opacity
         self.mode = mode
-        image = self.grid_image()
+        self.canvas = canvas
+        self.processes = processes
+        # the size follows the grid size when the cells change (see refresh)
+        self._auto_size = size is None
+        # the grid image is created when it's needed (see load)
         super(Grid, self).__init__(
-            image=image,
+            image=None,
             position=position,
             fit_block=fit_block,
             keep_proportion=keep_proportion,
-            size=size,
+            size=size or self.grid_size,
             background_color=background_color,
             background_opacity=background_opacity,
             mode=mode,
@@ -76,14 +128,58 @@ class Grid(ImageBlock):
             blocks.append(row_blocks)
         return blocks
 
+    @property
+    def layout(self) -> GridLayout:
+        """Layout of the grid.
+
+        It follows the current size of the blocks, so it's computed on every access except while the grid
+        image is rendered, when it's computed once (see :meth:`pin_layout`).
+        """
+        if self._pinned_layout is not None:
+            return self._pinned_layout
+        return self.compute_layout()
+
+    @contextmanager
+    def pin_layout(self, layout: GridLayout | None = None) -> Iterator[GridLayout]:
+        """Use the same layout for all the properties inside the context.
+
+        The blocks must not change their size inside the context.
+
+        Args:
+            layout: the layout to use. If None it's computed.
+        """
+        if self._pinned_layout is not None:
+            # nested contexts keep the outer layout
+            yield self._pinned_layout
+            return
+        self._pinned_layout = layout if layout is not None else self.compute_layout()
+        try:
+            yield self._pinned_layout
+        finally:
+            self._pinned_layout = None
+
+    def compute_layout(self) -> GridLayout:
+        """Compute the height of each row, the width of each column and their offsets in a single pass."""
+        blocks = self.blocks
+        row_heights = [0] * len(blocks)
+        column_widths = [0] * max([len(row) for row in blocks], default=0)
+        for n_row, row in enumerate(blocks):
+            for n_col, block in enumerate(row):
+                if block is None:
+                    continue
+                row_heights[n_row] = max(row_heights[n_row], block.height)
+                column_widths[n_col] = max(column_widths[n_col], block.width)
+        x_offsets = [0, *accumulate(width + self.x_space for width in column_widths[:-1])]
+        y_offsets = [0, *accumulate(height + self.y_space for height in row_heights[:-1])]
+        return GridLayout(row_heights, column_widths, x_offsets, y_offsets)
+
     def row_height(self, n_row: int) -> int:
         """Height of the n row.
 
         Args:
             n_row: the position of the row.
         """
-        row = self.blocks[n_row]
-        return max([block.height for block in row if block is not None])
+        return self.layout.row_heights[n_row]
 
     def column_width(self, n_column: int) -> int:
         """Width of the n column.
@@ -91,29 +187,162 @@ class Grid(ImageBlock):
         Args:
             n_column: the position of the column.
         """
-        column_blocks = [row[n_column] for row in self.blocks if len(row) > n_column]
-        return max([block.width for block in column_blocks if block is not None])
+        return self.layout.column_widths[n_column]
+
+    def cell_box(self, n_row: int, n_column: int) -> BoxType:
+        """Box (left, upper, right, lower) of the cell in the grid image.
+
+        Args:
+            n_row: the position of the row.
+            n_column: the position of the column.
+        """
+        layout = self.layout
+        x, y = layout.x_offsets[n_column], layout.y_offsets[n_row]
+        return x, y, x + layout.column_widths[n_column], y + layout.row_heights[n_row]
+
+    def cell_at(self, x: float, y: float) -> tuple[int, int] | None:
+        """Row and column of the cell that contains the point (x, y) of the grid image.
+
+        Returns None if the point falls in the space between cells or outside the grid.
+
+        Args:
+            x: x coordinate in pixels.
+            y: y coordinate in pixels.
+        """
+        layout = self.layout
+        n_row = bisect_right(layout.y_offsets, y) - 1
+        n_column = bisect_right(layout.x_offsets, x) - 1
+        if n_row < 0 or n_column < 0:
+            return None
+        _, _, right, lower = self.cell_box(n_row, n_column)
+        if x >= right or y >= lower:
+            return None
+        return n_row, n_column
 
     @property
     def grid_size(self) -> tuple[int, int]:
         """Size of the grid."""
-        height = sum([self.row_height(i) + self.y_space for i in range(len(self.blocks))])
-        n_columns = max([len(row) for row in self.blocks])
-        width = sum([self.column_width(i) + self.x_space for i in range(n_columns)])
+        layout = self.layout
+        height = sum(layout.row_heights) + self.y_space * len(layout.row_heights)
+        width = sum(layout.column_widths) + self.x_space * len(layout.column_widths)
         return int(width), int(height)
 
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the grid image, known without creating it."""
+        return self.grid_size
+
+    def block_positions(self) -> list[tuple[Block, tuple[int, int]]]:
+        """Blocks and the position (X,Y) of their top-left corner in the grid image."""
+        layout = self.layout
+        return [
+            (block, (int(layout.x_offsets[n_col]), int(layout.y_offsets[n_row])))
+            for n_row, row in enumerate(self._blocks)
+            for n_col, block in enumerate(row)
+            if block is not None
+        ]
+
     def grid_image(self):
         """Create the grid image."""
-        background_hex = self.background_color.hex(self.background_opacity)
-        im = ImPIL.new(self.mode, self.grid_size, background_hex)
-        pos = (0, 0)
-        for n_row, row in enumerate(self.blocks):
-            for n_col, block in enumerate(row):
-                i = block.image
-                im.paste(i, pos)
-                next_width = pos[0] + self.column_width(n_col) + self.x_space
-                # y position is the same for all blocks in the same row (pos[1])
-                pos = (next_width, pos[1])
-            next_height = pos[1] + self.row_height(n_row) + self.y_space
-            pos = (0, next_height)
+        with self.pin_layout() as layout:
+            self._layout = layout
+            background_hex = self.background_color.hex(self.background_opacity)
+            im = new_canvas(self.mode, self.grid_size, background_hex, self.canvas)
+            if self.processes == 1:
+                for block, pos in self.block_positions():
+                    im.paste(block.image, pos)
+            else:
+                # multiprocessing is only imported when it's used
+                from geepillow.parallel import paste_blocks
+
+                paste_blocks(im, self.block_positions(), self.processes)
         return im
+
+    def load(self) -> ImPIL.Image:
+        """Create the grid image."""
+        return self.grid_image()
+
+    def set_block(self, n_row: int, n_column: int, block: Block | None):
+        """Replace the block of a cell and update the grid image (see :meth:`refresh`).
+
+        Args:
+            n_row: the position of the row.
+            n_column: the position of the column.
+            block: the new block of the cell. None to leave it empty.
+        """
+        self._blocks[n_row][n_column] = block
+        self.refresh(n_row, n_column)
+
+    def refresh(self, n_row: int, n_column: int):
+        """Update the grid image after the block of a cell was replaced or modified.
+
+        If the grid image was already created only the cell is rendered again and painted on it. If the cell
+        changed the size of its row or column, the other cells are moved to their new position without
+        rendering them. Refresh each modified cell, one at a time; grids and strips that contain this grid must
+        be refreshed too.
+
+        Args:
+            n_row: the position of the row.
+            n_column: the position of the column.
+        """
+        old_layout = self._layout
+        with self.pin_layout() as layout:
+            self._layout = layout
+            if self._auto_size:
+                self.size = self.grid_size
+            if self._image is None or old_layout is None:
+                self.invalidate()
+                return
+            if layout != old_layout:
+                self._image = self.move_cells(self._image, old_layout, n_row, n_column)
+            self.paint_cell(n_row, n_column)
+        self.invalidate()
+
+    def move_cells(
+        self, image: ImPIL.Image, old_layout: GridLayout, n_row: int, n_column: int
+    ) -> ImPIL.Image:
+        """Copy the cells of an image rendered with another layout to their position in the current layout.
+
+        Only the row or the column of the cell (n_row, n_column) can differ between both layouts. The cell itself
+        is not copied.
+
+        Args:
+            image: the grid image rendered with the old layout.
+            old_layout: the layout of the image.
+            n_row: the position of the row.
+            n_column: the position of the column.
+        """
+        layout = self.layout
+        x_spans = moved_spans(
+            old_layout.x_offsets[n_column],
+            old_layout.column_widths[n_column],
+            layout.column_widths[n_column],
+            image.width,
+        )
+        y_spans = moved_spans(
+            old_layout.y_offsets[n_row],
+            old_layout.row_heights[n_row],
+            layout.row_heights[n_row],
+            image.height,
+        )
+        im = new_canvas(self.mode, self.grid_size, self.background_hex, self.canvas)
+        for i, (x_old, x_new, width) in enumerate(x_spans):
+            for j, (y_old, y_new, height) in enumerate(y_spans):
+                if (i, j) == (1, 1) or width <= 0 or height <= 0:
+                    continue
+                part = image.crop((x_old, y_old, x_old + width, y_old + height))
+                im.paste(part, (x_new, y_new))
+        return im
+
+    def paint_cell(self, n_row: int, n_column: int):
+        """Paint the block of a cell on the grid image, replacing what was in the cell.
+
+        Args:
+            n_row: the position of the row.
+            n_column: the position of the column.
+        """
+        box = self.cell_box(n_row, n_column)
+        self.source.paste(self.background_hex, box)
+        block = self._blocks[n_row][n_column]
+        if block is not None:
+            self.source.paste(block.image, box[:2])
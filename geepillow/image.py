@@ -1,13 +1,33 @@
 """image module."""
 
+from __future__ import annotations
+
+from collections.abc import Callable
 from io import BytesIO
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
-import ee
-import requests
 from PIL import Image
 
 from geepillow import colors
+from geepillow.cache import DiskCache, MemoryCache, make_key
+from geepillow.transport import Transport, default_transport
+
+if TYPE_CHECKING:
+    import ee
+    import numpy
+
+BackendType = Literal["thumbnail", "pixels"]
+
+# fragments of the messages of Earth Engine errors that are retried
+TRANSIENT_EE_ERRORS = (
+    "too many concurrent",
+    "too many requests",
+    "quota exceeded",
+    "rate limit",
+    "service unavailable",
+    "internal error",
+    "deadline exceeded",
+)
 
 
 def from_eeimage(
@@ -19,9 +39,17 @@ def from_eeimage(
     overlay: ee.FeatureCollection | ee.Feature | ee.Geometry | None = None,
     overlay_style: dict | None = None,
     style_property: str | None = None,
+    transport: Transport | None = None,
+    cache: DiskCache | None = None,
+    memory_cache: MemoryCache | None = None,
+    backend: BackendType = "thumbnail",
 ) -> Image:
     """Create a Pillow Image from an ee.Image.
 
+    The "thumbnail" backend requests the url of a PNG thumbnail and downloads it. The "pixels" backend
+    computes the pixels with ``ee.data.computePixels`` in a single call and wraps the returned array
+    without decoding it (see :func:`fetch_pixels`).
+
     Args:
         image: the ee.Image
         dimensions: dimensions of the image, in pixels. If only one number is passed, it is used as the maximum, and
@@ -37,7 +65,129 @@ def from_eeimage(
         overlay_style: style of the vector layer to overlay.
         style_property: A per-feature property expected to contain a dictionary. Values in the dictionary override any
             default values for that feature.
+        transport: the transport used to download the image. If None it'll use the default transport.
+        cache: a cache to store the downloaded image. If the image is already cached, it won't be requested to
+            Earth Engine.
+        memory_cache: an in-process cache of decoded images. If the image is already cached, a copy of it is
+            returned without requesting or decoding it again.
+        backend: "thumbnail" or "pixels". The "pixels" backend requests the pixels with the Earth Engine client,
+            the transport only provides the retry policy.
     """
+    if backend not in ("thumbnail", "pixels"):
+        raise ValueError(f"Backend '{backend}' not in {['thumbnail', 'pixels']}")
+    viz_image = visualize(
+        image,
+        viz_params=viz_params,
+        scale=scale,
+        overlay=overlay,
+        overlay_style=overlay_style,
+        style_property=style_property,
+    )
+    if backend == "pixels":
+        return fetch_pixels(
+            pixels_expression(viz_image, dimensions, region),
+            transport=transport,
+            cache=cache,
+            memory_cache=memory_cache,
+        )
+    viz = thumbnail_params(viz_params)
+    viz.update({"format": "png", "region": region, "dimensions": dimensions})
+    # the key identifies the whole expression (image, visualization, overlay) and the thumbnail parameters
+    return fetch(
+        (viz_image, viz),
+        lambda: viz_image.getThumbURL(viz),
+        transport=transport,
+        cache=cache,
+        memory_cache=memory_cache,
+    )
+
+
+def from_eecollection(
+    collection: ee.ImageCollection,
+    dimensions: tuple | int,
+    viz_params: dict | None = None,
+    scale: float | None = None,
+    region: ee.Geometry | ee.Feature | None = None,
+    overlay: ee.FeatureCollection | ee.Feature | ee.Geometry | None = None,
+    overlay_style: dict | None = None,
+    style_property: str | None = None,
+    n_images: int | None = None,
+    transport: Transport | None = None,
+    cache: DiskCache | None = None,
+    memory_cache: MemoryCache | None = None,
+) -> list[Image.Image]:
+    """Create a list of Pillow Images from an ee.ImageCollection using a single request.
+
+    All the images are requested together as a filmstrip (one image on top of the other) that is split locally, so
+    all of them share the same parameters.
+
+    Args:
+        collection: the ee.ImageCollection.
+        dimensions: dimensions of each image, in pixels. If only one number is passed, it is used as the maximum, and
+            the other dimension is computed by proportional scaling.
+        viz_params: dict with visualization parameters. See :func:`from_eeimage`.
+        scale: spatial resolution of the images. If None it'll use the scale of each image.
+        region: the region to extract the images from. It's required because all the images must share it.
+        overlay: a vector layer to overlay on top of each image.
+        overlay_style: style of the vector layer to overlay.
+        style_property: A per-feature property expected to contain a dictionary. Values in the dictionary override any
+            default values for that feature.
+        n_images: number of images in the collection. If None it'll be requested to Earth Engine.
+        transport: the transport used to download the filmstrip. If None it'll use the default transport.
+        cache: a cache to store the downloaded filmstrip.
+        memory_cache: an in-process cache of the decoded filmstrip.
+    """
+    import ee
+
+    if region is None:
+        raise ValueError("A region is needed to request all the images together.")
+    if n_images is None:
+        n_images = collection.size().getInfo()
+    if not n_images:
+        return []
+
+    def visualize_image(image):
+        return visualize(
+            ee.Image(image),
+            viz_params=viz_params,
+            scale=scale,
+            overlay=overlay,
+            overlay_style=overlay_style,
+            style_property=style_property,
+        )
+
+    viz_collection = collection.map(visualize_image)
+    viz = thumbnail_params(viz_params)
+    viz.update({"format": "png", "region": region, "dimensions": dimensions})
+    filmstrip = fetch(
+        (viz_collection, viz),
+        lambda: viz_collection.getFilmstripThumbURL(viz),
+        transport=transport,
+        cache=cache,
+        memory_cache=memory_cache,
+    )
+    width, height = filmstrip.size
+    frame_height = height // n_images
+    return [
+        filmstrip.crop((0, i * frame_height, width, (i + 1) * frame_height))
+        for i in range(n_images)
+    ]
+
+
+def visualize(
+    image: ee.Image,
+    viz_params: dict | None = None,
+    scale: float | None = None,
+    overlay: ee.FeatureCollection | ee.Feature | ee.Geometry | None = None,
+    overlay_style: dict | None = None,
+    style_property: str | None = None,
+) -> ee.Image:
+    """Visualize an ee.Image and blend the overlay on top of it.
+
+    See :func:`from_eeimage` for the description of the arguments.
+    """
+    import ee
+
     viz_params = viz_params or dict(min=0, max=1)
     overlay_style = overlay_style or dict(width=2, fillColor=colors.create("white").hex(0))
     if style_property is not None:
@@ -59,7 +209,19 @@ def from_eeimage(
     else:
         viz_image = image.visualize(**viz_params)
 
-    bands = "vis-gray" if len(viz_params.get("bands", [])) < 2 else "vis-red,vis-green,vis-blue"
+    return viz_image
+
+
+def thumbnail_params(viz_params: dict | None = None) -> dict[str, Any]:
+    """Parameters to request a visualized image as a thumbnail.
+
+    Args:
+        viz_params: the visualization parameters used to visualize the image.
+    """
+    viz_params = viz_params or dict(min=0, max=1)
+    # a palette makes an RGB image out of a single band
+    is_gray = len(viz_params.get("bands", [])) < 2 and "palette" not in viz_params
+    bands = "vis-gray" if is_gray else "vis-red,vis-green,vis-blue"
     _min = "0" if bands == "vis-gray" else "0,0,0"
     _max = "255" if bands == "vis-gray" else "255,255,255"
     viz: dict[str, Any] = {
@@ -67,9 +229,262 @@ def from_eeimage(
         "min": _min,
         "max": _max,
     }
-    viz.update({"format": "png", "region": region, "dimensions": dimensions})
-    url = viz_image.getThumbURL(viz)
-    raw = requests.get(url)
+    return viz
+
+
+def fetch(
+    key_parts: tuple,
+    get_url: Callable[[], str],
+    transport: Transport | None = None,
+    cache: DiskCache | None = None,
+    memory_cache: MemoryCache | None = None,
+) -> Image.Image:
+    """Fetch an image from Earth Engine using the caches.
+
+    The url is only requested to Earth Engine if the image is not cached.
+
+    Args:
+        key_parts: the objects that identify the image. See :func:`geepillow.cache.make_key`.
+        get_url: a function that returns the url of the image.
+        transport: the transport used to download the image. If None it'll use the default transport.
+        cache: a cache to store the downloaded image.
+        memory_cache: an in-process cache of decoded images.
+    """
+    return fetch_cached(
+        key_parts,
+        lambda: download(get_url(), transport),
+        lambda content: Image.open(BytesIO(content)),
+        cache=cache,
+        memory_cache=memory_cache,
+    )
+
+
+def fetch_cached(
+    key_parts: tuple,
+    get_content: Callable[[], bytes],
+    decode: Callable[[bytes], Image.Image],
+    cache: DiskCache | None = None,
+    memory_cache: MemoryCache | None = None,
+) -> Image.Image:
+    """Get an image from the caches, or produce and cache it.
+
+    Args:
+        key_parts: the objects that identify the image. See :func:`geepillow.cache.make_key`.
+        get_content: a function that requests the encoded image to Earth Engine.
+        decode: a function that decodes the content into an image.
+        cache: a cache to store the encoded image.
+        memory_cache: an in-process cache of decoded images.
+    """
+    key = make_key(*key_parts) if cache is not None or memory_cache is not None else ""
+    if memory_cache is not None:
+        cached = memory_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+    pil_image = decode(fetch_content(key, get_content, cache))
+    if memory_cache is not None:
+        pil_image.load()
+        memory_cache.set(key, pil_image)
+        return pil_image.copy()
+    return pil_image
+
+
+def pixels_expression(
+    image: ee.Image,
+    dimensions: tuple | int,
+    region: ee.Geometry | ee.Feature | None = None,
+) -> ee.Image:
+    """Clip and scale a visualized image to the dimensions requested, like a thumbnail.
+
+    Args:
+        image: the visualized image.
+        dimensions: dimensions of the image. See :func:`from_eeimage`.
+        region: the region to extract the image from. If None it'll use the boundaries of the image.
+    """
+    import ee
+
+    # a feature made of a geometry or of another feature, to get the geometry of both
+    geometry = image.geometry() if region is None else ee.Feature(region).geometry()
+    if isinstance(dimensions, (tuple, list)):
+        width, height = dimensions
+        return image.clipToBoundsAndScale(geometry=geometry, width=width, height=height)
+    return image.clipToBoundsAndScale(geometry=geometry, maxDimension=dimensions)
+
+
+def fetch_pixels(
+    expression: ee.Image,
+    transport: Transport | None = None,
+    cache: DiskCache | None = None,
+    memory_cache: MemoryCache | None = None,
+) -> Image.Image:
+    """Compute the pixels of a visualized image using the caches.
+
+    The pixels are requested to Earth Engine as a NumPy array, without encoding them as PNG. The disk
+    cache stores the array in NPY format.
+
+    Args:
+        expression: the visualized image, already clipped and scaled (see :func:`pixels_expression`).
+        transport: the transport whose retry policy is applied. If None it'll use the default transport.
+        cache: a cache to store the computed pixels.
+        memory_cache: an in-process cache of decoded images.
+    """
+    import numpy
+
+    def get_content() -> bytes:
+        buffer = BytesIO()
+        numpy.save(buffer, compute_pixels(expression, transport))
+        return buffer.getvalue()
+
+    return fetch_cached(
+        (expression, "pixels"),
+        get_content,
+        lambda content: array_image(numpy.load(BytesIO(content))),
+        cache=cache,
+        memory_cache=memory_cache,
+    )
+
+
+def compute_pixels(expression: ee.Image, transport: Transport | None = None) -> numpy.ndarray:
+    """Compute the pixels of an image in Earth Engine as a NumPy structured array (a field per band).
+
+    Transient errors (see :data:`TRANSIENT_EE_ERRORS`) are retried with the backoff of the transport.
+
+    Args:
+        expression: the image to compute.
+        transport: the transport whose retry policy is applied. If None it'll use the default transport.
+    """
+    import ee
+
+    transport = transport or default_transport()
+    request = {"expression": expression, "fileFormat": "NUMPY_NDARRAY"}
+    try:
+        return transport.call(
+            lambda: ee.data.computePixels(request), ee.EEException, is_transient_ee_error
+        )
+    except ee.EEException as e:
+        raise RuntimeError(f"Error computing pixels in Earth Engine: {e}") from e
+
+
+def is_transient_ee_error(error: BaseException) -> bool:
+    """Whether an Earth Engine error is worth retrying (quota, rate or availability errors)."""
+    message = str(error).lower()
+    return any(fragment in message for fragment in TRANSIENT_EE_ERRORS)
+
+
+def array_image(array: numpy.ndarray) -> Image.Image:
+    """Wrap the pixels of a visualized image in a Pillow image.
+
+    The bands of the structured array are viewed as the channels of the image without copying them.
+    Gray images share the memory of the array, RGB images are unpacked once by Pillow.
+
+    Args:
+        array: a structured array with one (gray) or three (RGB) 8-bit bands.
+    """
+    import numpy
+    from numpy.lib import recfunctions
+
+    if array.dtype.names:
+        array = recfunctions.structured_to_unstructured(array)
+    if array.ndim == 3 and array.shape[2] == 1:
+        array = array[:, :, 0]
+    return Image.fromarray(numpy.ascontiguousarray(array, dtype=numpy.uint8))
+
+
+def fetch_content(
+    key: str,
+    get_content: Callable[[], bytes],
+    cache: DiskCache | None = None,
+) -> bytes:
+    """Get some content from the disk cache, or produce and cache it.
+
+    Args:
+        key: the key of the content in the cache.
+        get_content: a function that requests the content to Earth Engine.
+        cache: a cache to store the content.
+    """
+    content = cache.get(key) if cache is not None else None
+    if content is None:
+        content = get_content()
+        if cache is not None:
+            cache.set(key, content)
+    return content
+
+
+def fetch_band(
+    image: ee.Image,
+    dimensions: tuple | int,
+    band: str | None = None,
+    scale: float | None = None,
+    region: ee.Geometry | ee.Feature | None = None,
+    transport: Transport | None = None,
+    cache: DiskCache | None = None,
+) -> numpy.ndarray:
+    """Fetch the values of a single band of an ee.Image.
+
+    The values are downloaded as they are (not visualized), so they can be visualized many times with
+    :func:`apply_palette` without requesting them again.
+
+    Args:
+        image: the ee.Image.
+        dimensions: dimensions of the array. See :func:`from_eeimage`.
+        band: the band to fetch. If None it'll fetch the first band.
+        scale: spatial resolution of the image. If None it'll use the image scale.
+        region: the region to extract the values from. If None it'll use the boundaries of the image.
+        transport: the transport used to download the values. If None it'll use the default transport.
+        cache: a cache to store the downloaded values.
+
+    Returns:
+        a 2D array with the values of the band.
+    """
+    import numpy
+
+    image = image.select([band if band is not None else 0])
+    if scale is not None:
+        image = image.reproject(image.projection().atScale(scale))
+    params = {"format": "NPY", "region": region, "dimensions": dimensions}
+    key = make_key(image, params) if cache is not None else ""
+    content = fetch_content(key, lambda: download(image.getDownloadURL(params), transport), cache)
+    values = numpy.load(BytesIO(content))
+    # the array has a field for each band
+    return values[values.dtype.names[0]] if values.dtype.names else values
+
+
+def apply_palette(
+    values: numpy.ndarray,
+    min: float = 0,
+    max: float = 1,
+    palette: list | None = None,
+) -> Image.Image:
+    """Visualize the values of a band with a palette, as Earth Engine does.
+
+    Values are stretched between min and max and mapped to a lookup table of 256 colors interpolated
+    along the palette (see :func:`geepillow.colors.palette_lut`).
+
+    Args:
+        values: a 2D array, like the ones returned by :func:`fetch_band`.
+        min: the value that gets the first color of the palette.
+        max: the value that gets the last color of the palette.
+        palette: a list of colors. If None it's a black to white gradient.
+    """
+    import numpy
+
+    lut = colors.palette_lut(palette or ["black", "white"])
+    span = (max - min) or 1
+    scaled = (numpy.asarray(values, dtype=numpy.float64) - min) * ((len(lut) - 1) / span)
+    indices = numpy.clip(numpy.rint(scaled), 0, len(lut) - 1).astype(numpy.uint8)
+    return Image.fromarray(lut[indices])
+
+
+def download(url: str, transport: Transport | None = None) -> bytes:
+    """Download the content of an Earth Engine url.
+
+    Args:
+        url: the url to download.
+        transport: the transport to use. If None it'll use the default transport.
+    """
+    import requests
+
+    transport = transport or default_transport()
+    raw = transport.get(url)
     if raw.status_code != requests.codes.ok:
         error_message = raw.text
         try:
@@ -81,4 +496,4 @@ def from_eeimage(
             # Not a JSON response, so we'll use the raw text as the error.
             pass
         raise RuntimeError(f"Error fetching image from Earth Engine: {error_message}")
-    return Image.open(BytesIO(raw.content))
+    return raw.content
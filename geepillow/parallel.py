@@ -0,0 +1,136 @@
+"""Render blocks in a pool of processes.
+
+Creating the image of a block (converting, resizing and pasting its element) is CPU
+bound, so threads don't help. Each block is rendered in a worker process that writes
+the pixels in a shared memory block; the parent process only pastes them in the canvas,
+without pickling the rendered images back.
+
+The blocks are sent to the workers with pickle, so they must be picklable and must not
+depend on the state of the parent process (e.g. Earth Engine blocks must be fetched
+before, see :func:`geepillow.eeblocks.prefetch`).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple
+
+from PIL import Image as ImPIL
+
+from geepillow.blocks import Block
+
+
+class SharedImage(NamedTuple):
+    """An image rendered in a shared memory block."""
+
+    name: str
+    mode: str
+    size: tuple[int, int]
+    palette: list[int] | None
+
+
+def shared_buffer(memory: shared_memory.SharedMemory) -> memoryview:
+    """The buffer of an open shared memory block."""
+    buffer = memory.buf
+    if buffer is None:
+        raise ValueError(f"The shared memory block '{memory.name}' is closed.")
+    return buffer
+
+
+def render_shared(block: Block) -> SharedImage:
+    """Render the block image in a new shared memory block.
+
+    The memory block must be released by the caller (see :func:`paste_shared`).
+
+    Args:
+        block: the block to render.
+    """
+    image = block.image
+    data = image.tobytes()
+    memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shared_buffer(memory)[: len(data)] = data
+    finally:
+        memory.close()
+    palette = image.getpalette() if image.mode == "P" else None
+    return SharedImage(memory.name, image.mode, image.size, palette)
+
+
+def paste_shared(canvas: ImPIL.Image, shared: SharedImage, position: tuple[int, int]):
+    """Paste an image rendered in a shared memory block and release the memory block.
+
+    Args:
+        canvas: the image to paste in.
+        shared: the image rendered by :func:`render_shared`.
+        position: position (X,Y) of the top-left corner of the image in the canvas.
+    """
+    memory = shared_memory.SharedMemory(name=shared.name)
+    try:
+        # frombuffer maps any buffer without copying it, although it's only annotated with bytes
+        image = ImPIL.frombuffer(
+            shared.mode,
+            shared.size,
+            shared_buffer(memory),  # type: ignore[arg-type]
+            "raw",
+            shared.mode,
+            0,
+            1,
+        )
+        if shared.palette is not None:
+            image.putpalette(shared.palette)
+        canvas.paste(image, position)
+        # the image references the memory block, it must be released before closing it
+        del image
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def release_shared(shared: SharedImage):
+    """Release the shared memory block of an image that won't be pasted.
+
+    Memory blocks already released are ignored.
+    """
+    try:
+        memory = shared_memory.SharedMemory(name=shared.name)
+    except FileNotFoundError:
+        return
+    memory.close()
+    memory.unlink()
+
+
+def paste_blocks(
+    canvas: ImPIL.Image,
+    positions: Sequence[tuple[Block, tuple[int, int]]],
+    processes: int | None = None,
+):
+    """Render the blocks in a pool of processes and paste them in the canvas.
+
+    The blocks must not overlap, because they are pasted in the order they finish.
+
+    Args:
+        canvas: the image to paste in.
+        positions: blocks and the position (X,Y) of their top-left corner in the canvas.
+        processes: number of worker processes. If None it's the number of CPUs.
+    """
+    # the workers must share the tracker of the parent process, otherwise each worker would try to
+    # clean up the memory blocks it created (and the parent will release) when it exits
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(render_shared, block): position for block, position in positions}
+        # futures whose memory block was (or is being) released by paste_shared
+        released = set()
+        try:
+            for future in as_completed(futures):
+                shared = future.result()
+                released.add(future)
+                paste_shared(canvas, shared, futures[future])
+        except BaseException:
+            # the blocks rendered anyway must not leak their memory
+            for future in futures:
+                if future in released or future.cancel() or future.exception() is not None:
+                    continue
+                release_shared(future.result())
+            raise
@@ -8,6 +8,7 @@ from PIL import Image as ImPIL
 
 from geepillow import colors
 from geepillow.blocks import DEFAULT_MODE, Block, ImageBlock, PositionType, TextBlock
+from geepillow.canvas import CanvasType, new_canvas
 
 if TYPE_CHECKING:
     from geepillow.eeblocks import EEImageBlock, EEImageCollectionGrid
@@ -19,6 +20,9 @@ class Strip(ImageBlock):
     A concatenation of blocks that behave like a block.
     """
 
+    # boxes of the blocks in the last render
+    _boxes: list[tuple[int, int, int, int] | None] | None = None
+
     def __init__(
         self,
         blocks: list[
@@ -33,6 +37,7 @@ class Strip(ImageBlock):
         background_color: str | colors.Color = "white",
         background_opacity: float = 1,
         mode: str = DEFAULT_MODE,
+        canvas: CanvasType = "memory",
     ):
         """Strip.
 
@@ -51,6 +56,8 @@ class Strip(ImageBlock):
             keep_proportion: keep proportion (ratio) of the image.
             size: size of the strip.
             mode: mode of the background image.
+            canvas: "memory" to create the image in memory, "memmap" to create it in a memory-mapped temporary
+                file that the operating system can page out of the RAM. See :mod:`geepillow.canvas`.
         """
         if orientation not in ["horizontal", "vertical"]:
             raise ValueError(f"Invalid orientation {orientation}.")
@@ -60,13 +67,16 @@ class Strip(ImageBlock):
         self._background_color = colors.create(background_color)
         self.background_opacity = background_opacity
         self.mode = mode
-        image = self.strip_image()
+        self.canvas = canvas
+        # the size follows the strip size when the blocks change (see refresh)
+        self._auto_size = size is None
+        # the strip image is created when it's needed (see load)
         super(Strip, self).__init__(
-            image=image,
+            image=None,
             position=position,
             fit_block=fit_block,
             keep_proportion=keep_proportion,
-            size=size,
+            size=size or self.strip_size,
             background_color=background_color,
             background_opacity=background_opacity,
             mode=mode,
@@ -115,18 +125,91 @@ class Strip(ImageBlock):
         """Size of the strip."""
         return int(self.strip_width), int(self.strip_height)
 
-    def strip_image(self):
-        """Create the strip image."""
-        background_hex = self.background_color.hex(self.background_opacity)
-        im = ImPIL.new(self.mode, self.strip_size, background_hex)
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the strip image, known without creating it."""
+        return self.strip_size
+
+    def block_positions(self) -> list[tuple[Block, tuple[int, int]]]:
+        """Blocks and the position (X,Y) of their top-left corner in the strip image."""
+        positions = []
         pos = (0, 0)
         for block in self.blocks:
-            i = block.image
-            im.paste(i, pos)
+            positions.append((block, (int(pos[0]), int(pos[1]))))
             if self.orientation == "horizontal":
                 next_width = pos[0] + block.width + self.space
                 pos = (next_width, 0)
             else:
                 next_height = pos[1] + block.height + self.space
                 pos = (0, next_height)
+        return positions
+
+    def block_boxes(self) -> list[tuple[int, int, int, int] | None]:
+        """Box (left, upper, right, lower) of each block in the strip image. None for missing blocks."""
+        positions = iter(self.block_positions())
+        boxes: list[tuple[int, int, int, int] | None] = []
+        for block in self._blocks:
+            if block is None:
+                boxes.append(None)
+                continue
+            _, (x, y) = next(positions)
+            boxes.append((x, y, x + int(block.width), y + int(block.height)))
+        return boxes
+
+    def strip_image(self):
+        """Create the strip image."""
+        self._boxes = self.block_boxes()
+        background_hex = self.background_color.hex(self.background_opacity)
+        im = new_canvas(self.mode, self.strip_size, background_hex, self.canvas)
+        for block, pos in self.block_positions():
+            im.paste(block.image, pos)
         return im
+
+    def load(self) -> ImPIL.Image:
+        """Create the strip image."""
+        return self.strip_image()
+
+    def set_block(self, index: int, block: Block | None):
+        """Replace a block and update the strip image (see :meth:`refresh`).
+
+        Args:
+            index: the position of the block in the strip.
+            block: the new block. None to remove it.
+        """
+        self._blocks[index] = block
+        self.refresh(index)
+
+    def refresh(self, index: int):
+        """Update the strip image after a block was replaced or modified.
+
+        If the strip image was already created only the block is rendered again and painted on it. If the block
+        changed its size, the other blocks are moved to their new position without rendering them. Refresh each
+        modified block, one at a time; grids and strips that contain this strip must be refreshed too.
+
+        Args:
+            index: the position of the block in the strip.
+        """
+        old_boxes = self._boxes
+        boxes = self.block_boxes()
+        self._boxes = boxes
+        if self._auto_size:
+            self.size = self.strip_size
+        if self._image is None or old_boxes is None:
+            self.invalidate()
+            return
+        image = self._image
+        others_moved = any(
+            old != new for i, (old, new) in enumerate(zip(old_boxes, boxes)) if i != index
+        )
+        if others_moved or image.size != self.strip_size:
+            im = new_canvas(self.mode, self.strip_size, self.background_hex, self.canvas)
+            for i, (old, new) in enumerate(zip(old_boxes, boxes)):
+                if i != index and old is not None and new is not None:
+                    im.paste(image.crop(old), new[:2])
+            self._image = image = im
+        elif old_boxes[index] is not None:
+            image.paste(self.background_hex, old_boxes[index])
+        block, box = self._blocks[index], boxes[index]
+        if block is not None and box is not None:
+            image.paste(block.image, box[:2])
+        self.invalidate()
@@ -0,0 +1,180 @@
+"""HTTP transport used to download images from Earth Engine.
+
+All the downloads go through a :class:`Transport`, which keeps a single pooled
+``requests.Session`` (so connections are reused between thumbnails), applies a
+timeout to every request and retries transient errors with exponential backoff
+and jitter.
+
+A default transport is shared by the whole package. It can be replaced using
+:func:`set_default_transport` or passing a ``transport`` to the functions and
+classes that download images.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from logging import getLogger
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    import requests
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class Transport:
+    """Pooled and retrying HTTP transport."""
+
+    def __init__(
+        self,
+        pool_size: int = 32,
+        timeout: float | tuple[float, float] = (10, 120),
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60,
+        retry_status: tuple[int, ...] = RETRY_STATUS,
+    ):
+        """Pooled and retrying HTTP transport.
+
+        The session is created on first use and can be safely shared between threads.
+
+        Args:
+            pool_size: maximum number of connections kept alive per host.
+            timeout: timeout in seconds of each request. It can be a tuple (connect, read).
+            max_retries: maximum number of retries for a single request.
+            backoff_factor: base of the exponential backoff in seconds. The delay before the n
+                retry is a random value between 0 and ``backoff_factor * 2 ** n``.
+            max_backoff: maximum delay in seconds between retries.
+            retry_status: HTTP status codes that will be retried.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_status = retry_status
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session."""
+        if self._session is None:
+            # requests is only imported when something is downloaded
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def backoff(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Delay in seconds before the next retry.
+
+        If the server sent a ``Retry-After`` header (in seconds) it is respected.
+
+        Args:
+            attempt: number of the failed attempt, starting at 0.
+            response: the failed response, if any.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        delay = min(self.backoff_factor * 2**attempt, self.max_backoff)
+        return random.uniform(0, delay)
+
+    def get(self, url: str) -> requests.Response:
+        """Send a GET request retrying transient errors.
+
+        The last response is returned if it keeps failing with one of the ``retry_status``. Connection errors
+        and timeouts are raised once all the retries are exhausted.
+
+        Args:
+            url: the url to request.
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.debug(f"Request failed with {e!r}, retrying")
+            else:
+                if response.status_code not in self.retry_status or attempt >= self.max_retries:
+                    return response
+                logger.debug(f"Request failed with status {response.status_code}, retrying")
+            time.sleep(self.backoff(attempt, response))
+            attempt += 1
+
+    def call(
+        self,
+        function: Callable[[], T],
+        errors: type[BaseException] | tuple[type[BaseException], ...],
+        is_transient: Callable[[BaseException], bool] | None = None,
+    ) -> T:
+        """Call a function retrying transient errors with the backoff of the transport.
+
+        For requests that don't go through the session, like the ones of the Earth Engine client.
+
+        Args:
+            function: the function to call.
+            errors: the errors that can be retried. They are raised once all the retries are exhausted.
+            is_transient: a function that tells whether an error is worth retrying. If None all the errors
+                are retried.
+        """
+        attempt = 0
+        while True:
+            try:
+                return function()
+            except errors as e:
+                if attempt >= self.max_retries or (
+                    is_transient is not None and not is_transient(e)
+                ):
+                    raise
+                logger.debug(f"Call failed with {e!r}, retrying")
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def close(self):
+        """Close the session and all its connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_default_transport = Transport()
+
+
+def default_transport() -> Transport:
+    """The transport shared by the whole package."""
+    return _default_transport
+
+
+def set_default_transport(transport: Transport):
+    """Replace the transport shared by the whole package.
+
+    Args:
+        transport: the new default transport.
+    """
+    global _default_transport
+    _default_transport = transport
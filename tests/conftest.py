@@ -1,5 +1,7 @@
 """Pytest session configuration."""
 
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
 from pathlib import Path
 
@@ -175,3 +177,38 @@ def s2_image_viz() -> dict:
 def fail_image() -> ee.Image:
     """An empty collection to test failure cases."""
     return ee.ImageCollection.fromImages([ee.Image(1).toInt(), ee.Image(2).toFloat()]).mean()
+
+
+@pytest.fixture
+def http_server():
+    """A factory of local HTTP servers.
+
+    ``http_server(respond, path)`` starts a server that answers every GET request with the status and body
+    returned by ``respond(n)``, where n is the number of the request (starting at 1). It returns the url
+    of the server (ending with path) and the list of paths requested. The servers are stopped after the test.
+    """
+    servers = []
+
+    def start(respond, path: str = "") -> tuple[str, list[str]]:
+        calls: list[str] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                calls.append(self.path)
+                status, body = respond(len(calls))
+                self.send_response(status)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}{path}", calls
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -1,5 +1,8 @@
 """Test blocks module."""
 
+import pytest
+from PIL import ImageDraw
+
 from geepillow import blocks, eeblocks, fonts
 
 
@@ -235,6 +238,83 @@ class TestImageBlock:
         )
         pil_image_regression.check(block.image)
 
+    def test_image_cache(self, optical_pil_image):
+        """Test the rendered image is reused until a property is modified."""
+        block = blocks.ImageBlock(optical_pil_image, size=(800, 800))
+        image = block.image
+        assert block.image is image
+        block.position = "top-left"
+        assert block.image is not image
+        image = block.image
+        block.size = (100, 100)
+        assert block.image.size == (100, 100)
+        assert block.element.size == (100, 100)
+
+    def test_image_block_without_image(self):
+        """Test an ImageBlock without image needs the size and fails when rendered."""
+        with pytest.raises(ValueError):
+            blocks.ImageBlock(None)
+        block = blocks.ImageBlock(None, size=(100, 100))
+        assert block.size == (100, 100)
+        assert not block.loaded
+        with pytest.raises(ValueError):
+            block.image
+
+    def test_image_mode(self, optical_pil_image):
+        """Test the image is only converted if it's not in the block mode."""
+        for mode in ["L", "LA", "RGB", "RGBA"]:
+            image = optical_pil_image.convert(mode)
+            block = blocks.ImageBlock(image, size=(600, 600), mode=mode)
+            assert block.source is image
+            assert block.image.mode == mode
+        block = blocks.ImageBlock(optical_pil_image.convert("RGB"), mode="L")
+        assert block.source.mode == "L"
+
+    def test_image_not_shared(self, optical_pil_image):
+        """Test drawing on the block image doesn't modify the image given to the block."""
+        image = optical_pil_image.convert("RGBA")
+        block = blocks.ImageBlock(image)
+        assert block.image is not image
+        ImageDraw.Draw(block.image).rectangle((0, 0, 10, 10), fill="red")
+        assert image.getpixel((0, 0)) != (255, 0, 0, 255)
+
+    def test_resampling(self, optical_pil_image):
+        """Test the resampling policies resize the image to the element size."""
+        for resampling in ["default", "fast", "quality"]:
+            block = blocks.ImageBlock(optical_pil_image, size=(100, 100), resampling=resampling)
+            assert block.element.size == (100, 100)
+        with pytest.raises(ValueError):
+            blocks.ImageBlock(optical_pil_image, resampling="slow")
+
+    def test_from_file_draft(self, optical_pil_image, tmp_path):
+        """Test JPEG images are decoded at the smallest scale each resampling allows."""
+        filename = tmp_path / "optical.jpg"
+        optical_pil_image.convert("RGB").save(filename)  # 500x500
+        block = blocks.ImageBlock.from_file(filename, size=(100, 100), resampling="fast")
+        assert block.source.size == (125, 125)
+        # the other policies keep twice the size of the block
+        quality = blocks.ImageBlock.from_file(filename, size=(100, 100), resampling="quality")
+        assert quality.source.size == (250, 250)
+        default = blocks.ImageBlock.from_file(filename, size=(300, 300))
+        assert default.source.size == (500, 500)
+        assert block.image.size == (100, 100)
+
+    def test_from_file_lazy(self, optical_pil_image, tmp_path):
+        """Test a lazy block reads the size from the file and decodes it when rendered."""
+        filename = tmp_path / "optical.jpg"
+        optical_pil_image.convert("RGB").save(filename)  # 500x500
+        block = blocks.ImageBlock.from_file(filename, lazy=True, size=(100, 50), resampling="fast")
+        assert isinstance(block, blocks.FileImageBlock)
+        assert not block.loaded
+        assert block.element_size == (50, 50)
+        assert block.image.size == (100, 50)
+        assert block.source.size == (63, 63)
+        default = blocks.ImageBlock.from_file(filename, lazy=True, size=(100, 50))
+        assert default.source.size == (125, 125)
+        assert default.image.size == (100, 50)
+        full = blocks.ImageBlock.from_file(filename, lazy=True)
+        assert full.image.tobytes() == blocks.ImageBlock.from_file(filename).image.tobytes()
+
 
 class TestTextBlock:
     """Test the TextBlock."""
@@ -283,6 +363,46 @@ class TestTextBlock:
         block.font = fonts.opensans_bold(12)
         pil_image_regression.check(block.image)
 
+    def test_text_image_cache(self):
+        """Test equal labels are measured and rendered once."""
+        block = blocks.TextBlock("cached label", background_color="red")
+        other = blocks.TextBlock("cached label", background_color="red", size=(200, 50))
+        assert other.source.tobytes() == block.source.tobytes()
+        assert other.source is not block.source
+        hits = blocks.text_size.cache_info().hits
+        assert (other.text_width, other.text_height) == block.source.size
+        assert blocks.text_size.cache_info().hits == hits + 2
+
+    def test_text_image_not_shared(self):
+        """Test drawing on the image of a label doesn't modify other equal labels."""
+        block = blocks.TextBlock("shared label", background_color="white")
+        ImageDraw.Draw(block.image).rectangle((0, 0, *block.image.size), fill="red")
+        other = blocks.TextBlock("shared label", background_color="white")
+        assert other.image.getpixel((0, 0)) == (255, 255, 255, 255)
+
+    def test_text_fit(self):
+        """Test the largest font that fits the text in the block is used."""
+        text = "A label that fits\nin two lines"
+        block = blocks.TextBlock.fit(text, (200, 80), background_color="red")
+        assert block.size == (200, 80)
+        assert block.text_width <= 200 and block.text_height <= 80
+        bigger = fonts.create(block.font, block.font.size + 1)
+        width, height = blocks.text_size(bigger, text)
+        assert width > 200 or height > 80
+        hits = blocks.fit_font.cache_info().hits
+        assert blocks.TextBlock.fit(text, (200, 80)).font is block.font
+        assert blocks.fit_font.cache_info().hits == hits + 1
+
+    def test_text_change_text(self):
+        """Test changing the text of a block created without size."""
+        block = blocks.TextBlock("simple", background_color="red")
+        block.image  # render it
+        block.text = "a longer text"
+        block.background_color = "blue"
+        expected = blocks.TextBlock("a longer text", background_color="blue")
+        assert block.size == expected.size
+        assert block.image.tobytes() == expected.image.tobytes()
+
 
 class TestEEImageBlock:
     """Test EEImageBlock."""
@@ -306,3 +426,28 @@ class TestEEImageBlock:
             position="top-left",
         )
         pil_image_regression.check(block.image)
+
+    def test_eeimage_lazy(self, s2_image, s2_image_overlay, s2_image_viz):
+        """Test lazy EEImageBlocks are only fetched when needed."""
+        lazy_blocks = [
+            eeblocks.EEImageBlock(
+                s2_image, viz_params=s2_image_viz, region=s2_image_overlay, lazy=True
+            )
+            for _ in range(2)
+        ]
+        assert not any(block.loaded for block in lazy_blocks)
+        eeblocks.prefetch(lazy_blocks)
+        assert all(block.loaded for block in lazy_blocks)
+        assert lazy_blocks[0].image.size == (500, 500)
+
+    def test_eeimage_client_palette(self, s2_image, s2_image_overlay):
+        """Test restyling a block visualized locally doesn't request the band again."""
+        viz_params = dict(bands=["B4"], min=0, max=3000, palette=["black", "red"])
+        block = eeblocks.EEImageBlock(
+            s2_image, viz_params=viz_params, region=s2_image_overlay, palette_mode="client"
+        )
+        band = block.band
+        assert block.image.mode == block.mode
+        block.restyle(dict(bands=["B4"], min=0, max=1000, palette=["black", "green"]))
+        assert block.band is band
+        assert block.element.size == block.source.size
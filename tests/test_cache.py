@@ -0,0 +1,93 @@
+"""Test cache module."""
+
+import os
+
+from PIL import Image
+
+from geepillow.cache import DiskCache, MemoryCache, image_nbytes, make_key
+
+
+class TestMakeKey:
+    """Test the make_key function."""
+
+    def test_same_parts(self):
+        """Test that equal parts make equal keys."""
+        assert make_key({"a": 1, "b": 2}, (10, 10)) == make_key({"b": 2, "a": 1}, (10, 10))
+
+    def test_different_parts(self):
+        """Test that different parts make different keys."""
+        assert make_key({"a": 1}, (10, 10)) != make_key({"a": 1}, (10, 11))
+
+
+class TestDiskCache:
+    """Test the DiskCache class."""
+
+    def test_get_set(self, tmp_path):
+        """Test storing and retrieving an entry."""
+        cache = DiskCache(tmp_path)
+        assert cache.get("key") is None
+        cache.set("key", b"content")
+        assert cache.get("key") == b"content"
+
+    def test_evict(self, tmp_path):
+        """Test the least recently used entry is evicted."""
+        cache = DiskCache(tmp_path, max_size=20)
+        cache.set("old", b"0" * 10)
+        cache.set("new", b"1" * 10)
+        # make "old" the least recently used
+        os.utime(cache.path("old"), (0, 0))
+        cache.set("newer", b"2" * 10)
+        assert cache.get("old") is None
+        assert cache.get("new") == b"1" * 10
+        assert cache.get("newer") == b"2" * 10
+
+    def test_overwrite(self, tmp_path):
+        """Test overwriting an entry doesn't count the replaced content."""
+        cache = DiskCache(tmp_path)
+        cache.set("other", b"0" * 10)
+        for _ in range(3):
+            cache.set("key", b"1" * 10)
+        assert cache._size == 20
+        assert cache.get("key") == b"1" * 10
+
+    def test_ttl(self, tmp_path):
+        """Test expired entries are not returned."""
+        cache = DiskCache(tmp_path, ttl=60)
+        cache.set("key", b"content")
+        os.utime(cache.path("key"), (0, 0))
+        assert cache.get("key") is None
+        assert not cache.path("key").exists()
+
+
+class TestMemoryCache:
+    """Test the MemoryCache class."""
+
+    def test_get_set(self):
+        """Test storing and retrieving an image."""
+        cache = MemoryCache()
+        image = Image.new("RGBA", (10, 10))
+        assert cache.get("key") is None
+        cache.set("key", image)
+        assert cache.get("key") is image
+        assert cache.stats == dict(hits=1, misses=1, evictions=0, entries=1, nbytes=400)
+
+    def test_evict_by_bytes(self):
+        """Test the least recently used image is evicted when the budget is exceeded."""
+        image = Image.new("RGBA", (10, 10))
+        cache = MemoryCache(max_bytes=2 * image_nbytes(image))
+        cache.set("a", image)
+        cache.set("b", image)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", image)
+        assert cache.get("b") is None
+        assert cache.get("a") is image
+        assert cache.get("c") is image
+        assert cache.stats["evictions"] == 1
+        assert cache.nbytes == 800
+
+    def test_image_nbytes(self):
+        """Test the number of bytes of different modes."""
+        assert image_nbytes(Image.new("L", (10, 10))) == 100
+        assert image_nbytes(Image.new("RGB", (10, 10))) == 400
+        assert image_nbytes(Image.new("LA", (10, 10))) == 400
+        assert image_nbytes(Image.new("I;16", (10, 10))) == 200
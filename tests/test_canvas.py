@@ -0,0 +1,53 @@
+"""Test canvas module."""
+
+import pytest
+
+from geepillow import blocks, canvas, grids, strips
+
+
+class TestNewCanvas:
+    """Test the new_canvas function."""
+
+    def test_memmap(self, tmp_path):
+        """Test a memory-mapped canvas can be painted in place."""
+        image = canvas.new_canvas("RGBA", (20, 10), "red", "memmap", tmp_path)
+        assert image.getpixel((0, 0)) == (255, 0, 0, 255)
+        image.paste("blue", (0, 0, 5, 5))
+        assert image.getpixel((0, 0)) == (0, 0, 255, 255)
+        assert image.getpixel((10, 5)) == (255, 0, 0, 255)
+
+    def test_memmap_mode(self):
+        """Test modes that can't be memory-mapped."""
+        with pytest.raises(ValueError):
+            canvas.new_canvas("RGB", (10, 10), "red", "memmap")
+
+    def test_unknown_canvas(self):
+        """Test an unknown type of canvas."""
+        with pytest.raises(ValueError):
+            canvas.new_canvas("RGBA", (10, 10), "red", "disk")  # type: ignore[arg-type]
+
+
+class TestMemmapBlocks:
+    """Test strips and grids painted in memory-mapped canvases."""
+
+    def test_strip(self, optical_pil_image):
+        """Test the memory-mapped strip is equal to the in-memory strip."""
+        kwargs = dict(
+            blocks=[blocks.ImageBlock(optical_pil_image), blocks.TextBlock(text="Text")],
+            background_color="blue",
+        )
+        memory = strips.Strip(**kwargs)
+        memmap = strips.Strip(canvas="memmap", **kwargs)
+        assert memmap.image.tobytes() == memory.image.tobytes()
+
+    def test_grid(self, optical_pil_image):
+        """Test the memory-mapped grid is equal to the in-memory grid."""
+        im_block = blocks.ImageBlock(optical_pil_image)
+        kwargs = dict(
+            blocks=[[im_block, blocks.TextBlock(text="Text")], [None, im_block]],
+            background_color="cyan",
+            background_opacity=0.5,
+        )
+        memory = grids.Grid(**kwargs)
+        memmap = grids.Grid(canvas="memmap", **kwargs)
+        assert memmap.image.tobytes() == memory.image.tobytes()
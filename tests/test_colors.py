@@ -0,0 +1,90 @@
+"""Test colors module."""
+
+import colorsys
+
+import numpy
+import pytest
+from PIL import Image
+
+from geepillow import colors
+
+
+class TestColor:
+    """Test the Color class."""
+
+    def test_hex(self):
+        """Test the hex string with opacity."""
+        color = colors.Color(255, 128, 0)
+        assert color.hex() == "#FF8000FF"
+        assert color.hex(0) == "#FF800000"
+        color.red = 0
+        assert color.hex() == "#008000FF"
+
+    def test_slots(self):
+        """Test colors don't accept new attributes."""
+        with pytest.raises(AttributeError):
+            colors.Color(0, 0, 0).alpha = 1
+
+
+RGB = [(255, 0, 0), (0, 128, 255), (10, 10, 10), (255, 255, 255), (200, 150, 30)]
+
+
+class TestPalette:
+    """Test the Palette class."""
+
+    def test_hex(self):
+        """Test hex strings are the same than those of each color."""
+        palette = colors.Palette(RGB)
+        assert palette.hex(0.5) == [colors.Color(*rgb).hex(0.5) for rgb in RGB]
+        assert colors.Palette.from_hex(palette.hex()) == palette
+
+    def test_hsv(self):
+        """Test the HSV conversions match colorsys and Color."""
+        palette = colors.Palette(RGB)
+        expected = [colorsys.rgb_to_hsv(*(value / 255 for value in rgb)) for rgb in RGB]
+        assert palette.hsv() == pytest.approx(numpy.array(expected))
+        hsv = [(0, 1, 1), (200, 0.5, 0.8), (330, 0.2, 0.4), (90, 0, 0.5)]
+        colors_hsv = [colors.Color.from_hsv(*values).rgb() for values in hsv]
+        assert [color.rgb() for color in colors.Palette.from_hsv(hsv)] == colors_hsv
+
+    def test_interpolate_stops(self):
+        """Test interpolating colors placed at custom stops."""
+        palette = colors.Palette.from_colors(["black", "red", "white"])
+        result = palette.interpolate(5, stops=[0, 0.25, 1])
+        assert result.rgb.tolist()[:3] == [[0, 0, 0], [255, 0, 0], [255, 85, 85]]
+        with pytest.raises(ValueError):
+            palette.interpolate(5, stops=[0, 1])
+
+    def test_lut_in_pil(self):
+        """Test the lookup table used with putpalette and point gives the same image."""
+        palette = colors.Palette.from_colors(["blue", "yellow"])
+        gradient = Image.linear_gradient("L")
+        paletted = gradient.convert("P")
+        paletted.putpalette(palette.putpalette_data())
+        pointed = gradient.convert("RGB").point(palette.point_table())
+        assert paletted.convert("RGB").tobytes() == pointed.tobytes()
+
+
+class TestPaletteLut:
+    """Test the palette_lut function."""
+
+    def test_palette_lut(self):
+        """Test the colors are interpolated along the palette."""
+        lut = colors.palette_lut(["#000000", "#ff0000", "#ffffff"], n=5)
+        assert lut.shape == (5, 3)
+        assert lut.tolist() == [
+            [0, 0, 0],
+            [128, 0, 0],
+            [255, 0, 0],
+            [255, 128, 128],
+            [255, 255, 255],
+        ]
+
+    def test_palette_lut_single(self):
+        """Test a palette with a single color."""
+        assert colors.palette_lut(["#0000ff"], n=3).tolist() == [[0, 0, 255]] * 3
+
+    def test_palette_lut_empty(self):
+        """Test an empty palette."""
+        with pytest.raises(ValueError):
+            colors.palette_lut([])
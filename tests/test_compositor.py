@@ -0,0 +1,122 @@
+"""Test compositor module."""
+
+import pytest
+from PIL import Image
+
+from geepillow import blocks, compositor, grids, strips
+
+
+@pytest.fixture
+def nested_grid(optical_pil_image) -> grids.Grid:
+    """A grid of strips with blocks of different sizes."""
+    im_block = blocks.ImageBlock(optical_pil_image)
+    strip_v1 = strips.Strip(
+        blocks=[im_block, blocks.TextBlock(text="Text block N°1", background_color="red")],
+        background_color="blue",
+        orientation="vertical",
+    )
+    strip_v2 = strips.Strip(
+        blocks=[im_block, blocks.TextBlock(text="Text block N°2", background_color="green")],
+        background_color="yellow",
+        orientation="vertical",
+        size=(300, 300),
+    )
+    small = blocks.ImageBlock(
+        optical_pil_image, size=(100, 800), fit_block=False, position="top-left"
+    )
+    return grids.Grid(
+        blocks=[[strip_v1, strip_v2], [small, im_block]],
+        background_color="cyan",
+        background_opacity=0.5,
+    )
+
+
+class LazyBlock(blocks.ImageBlock):
+    """A block that creates its image when it's loaded, counting the loads."""
+
+    def __init__(self, color: str, known_size: bool, **kwargs):
+        """Store the color of the image and whether its size is known without loading it."""
+        self.color = color
+        self.known_size = known_size
+        self.loads = 0
+        super().__init__(image=None, size=(100, 100), **kwargs)
+
+    @property
+    def source_size(self) -> tuple[int, int]:
+        """Size of the image, known without loading it if known_size."""
+        return (80, 80) if self.known_size else super().source_size
+
+    def load(self) -> Image.Image:
+        """Create the image."""
+        self.loads += 1
+        return Image.new("RGBA", (80, 80), self.color)
+
+
+class TestRender:
+    """Test the render function."""
+
+    def test_render_nested(self, nested_grid):
+        """Test the flattened rendering is equal to the nested rendering."""
+        flat = compositor.render(nested_grid)
+        strip_v1 = nested_grid.blocks[0][0]
+        # the strip fits in its cell, so its image is never created
+        assert not strip_v1.loaded
+        assert flat.tobytes() == nested_grid.image.tobytes()
+
+    def test_flatten_resized(self, nested_grid):
+        """Test that resized strips are painted as a leaf."""
+        strip_v2 = nested_grid.blocks[0][1]
+        kinds = [p.kind for p in compositor.flatten(strip_v2)]
+        assert kinds == ["background", "element"]
+
+
+class TestRenderToFile:
+    """Test rendering to a file in bands."""
+
+    def test_render_to_file(self, nested_grid, tmp_path):
+        """Test the streamed PNG is equal to the image of the grid."""
+        filename = tmp_path / "grid.png"
+        compositor.render_to_file(nested_grid, filename, band_height=100)
+        with Image.open(filename) as image:
+            assert image.mode == nested_grid.mode
+            assert image.tobytes() == nested_grid.image.tobytes()
+
+    def test_render_to_file_mode(self, tmp_path):
+        """Test modes that can't be streamed."""
+        with pytest.raises(ValueError):
+            compositor.render_to_file(blocks.Block(mode="CMYK"), tmp_path / "cmyk.png")
+
+    def test_render_to_file_releases(self, optical_pil_image, tmp_path):
+        """Test lazy blocks are released after the last band they are painted in."""
+        filename = tmp_path / "optical.png"
+        optical_pil_image.save(filename)
+        cells = [
+            [blocks.FileImageBlock(filename, size=(100, 100)) for _ in range(4)] for _ in range(4)
+        ]
+        grid = grids.Grid(blocks=cells)
+        expected = grids.Grid(
+            blocks=[[blocks.ImageBlock.from_file(filename, size=(100, 100))] * 4] * 4
+        )
+        compositor.render_to_file(grid, tmp_path / "grid.png", band_height=64)
+        leaves = [block for row in cells for block in row]
+        assert not any(block.loaded or block._element is not None for block in leaves)
+        with Image.open(tmp_path / "grid.png") as image:
+            assert image.tobytes() == expected.image.tobytes()
+
+    @pytest.mark.parametrize("known_size", [True, False])
+    def test_render_to_file_lazy(self, known_size, tmp_path):
+        """Test lazy blocks without a file are released, even if their size is only known loading them."""
+        cells = [[LazyBlock("red", known_size) for _ in range(3)] for _ in range(3)]
+        grid = grids.Grid(blocks=cells)
+        compositor.render_to_file(grid, tmp_path / "grid.png", band_height=32)
+        leaves = [block for row in cells for block in row]
+        assert not any(block.loaded for block in leaves)
+        assert all(block.loads == 1 for block in leaves)
+        with Image.open(tmp_path / "grid.png") as image:
+            assert image.tobytes() == grid.image.tobytes()
+
+    def test_flatten_lazy(self):
+        """Test blocks that know their size are not loaded to flatten them."""
+        block = LazyBlock("red", known_size=True)
+        list(compositor.flatten(grids.Grid(blocks=[[block]])))
+        assert not block.loaded
@@ -1,8 +1,9 @@
 """Test eeimage module."""
 
+import numpy
 import pytest
 
-from geepillow.image import from_eeimage
+from geepillow.image import apply_palette, array_image, from_eecollection, from_eeimage
 
 
 class TestImage:
@@ -60,7 +61,69 @@ class TestImage:
 
         pil_image_regression.check(image)
 
+    def test_from_eeimage_pixels(self, s2_image, s2_image_overlay, s2_image_viz):
+        """Test computing the pixels gives the same image than the thumbnail."""
+        params = dict(dimensions=(500, 500), viz_params=s2_image_viz, region=s2_image_overlay)
+        thumbnail = from_eeimage(s2_image, **params)
+        pixels = from_eeimage(s2_image, backend="pixels", **params)
+        assert pixels.mode == thumbnail.mode
+        assert pixels.size == thumbnail.size
+        # both are computed by Earth Engine from the same expression, resampling may differ slightly
+        difference = numpy.abs(numpy.asarray(pixels, int) - numpy.asarray(thumbnail, int))
+        assert difference.mean() < 2
+        assert numpy.percentile(difference, 99) <= 16
+
     def test_from_eeimage_fail(self, fail_image, s2_image_overlay):
         """Test eeimage module with invalid parameters."""
         with pytest.raises(RuntimeError):
             from_eeimage(fail_image, dimensions=500, region=s2_image_overlay)
+
+    def test_from_eecollection(self, s2_collection, s2_collection_geometry, s2_image_viz):
+        """Test requesting all the images of a collection in a single filmstrip."""
+        images = from_eecollection(
+            s2_collection,
+            dimensions=(200, 200),
+            viz_params=s2_image_viz,
+            region=s2_collection_geometry,
+        )
+        assert len(images) == s2_collection.size().getInfo()
+        assert all(image.size == (200, 200) for image in images)
+
+
+class TestApplyPalette:
+    """Test the apply_palette function."""
+
+    def test_apply_palette(self):
+        """Test values are stretched between min and max and clipped."""
+        values = numpy.array([[-10, 0, 40], [100, 200, 1000]], dtype=numpy.int16)
+        image = apply_palette(values, min=0, max=100, palette=["#000000", "#ff0000"])
+        assert image.mode == "RGB"
+        assert image.size == (3, 2)
+        assert image.getpixel((0, 0)) == (0, 0, 0)
+        assert image.getpixel((1, 0)) == (0, 0, 0)
+        assert image.getpixel((2, 0)) == (102, 0, 0)
+        assert image.getpixel((0, 1)) == (255, 0, 0)
+        assert image.getpixel((2, 1)) == (255, 0, 0)
+
+
+class TestArrayImage:
+    """Test the array_image function."""
+
+    def test_array_image_rgb(self):
+        """Test the bands of a structured array are the channels of the image."""
+        array = numpy.zeros(
+            (4, 5), dtype=[("vis-red", "u1"), ("vis-green", "u1"), ("vis-blue", "u1")]
+        )
+        array["vis-green"] = 7
+        image = array_image(array)
+        assert image.mode == "RGB"
+        assert image.size == (5, 4)
+        assert image.getpixel((1, 1)) == (0, 7, 0)
+
+    def test_array_image_gray(self):
+        """Test a single band makes a gray image."""
+        array = numpy.zeros((4, 5), dtype=[("vis-gray", "u1")])
+        array["vis-gray"][1, 2] = 9
+        image = array_image(array)
+        assert image.mode == "L"
+        assert image.getpixel((2, 1)) == 9
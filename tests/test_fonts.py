@@ -0,0 +1,55 @@
+"""Test fonts module."""
+
+from pathlib import Path
+
+import pytest
+
+from geepillow import fonts
+
+
+@pytest.fixture
+def font_server(http_server):
+    """A local server that serves a font file."""
+    data = fonts.load_data(Path("OpenSans-Regular.ttf"))
+    return http_server(lambda n: (200, data), "/font.ttf")
+
+
+class TestFontRegistry:
+    """Test the FontRegistry class."""
+
+    def test_sizes_share_data(self):
+        """Test the fonts of all sizes are created from the same bytes."""
+        registry = fonts.FontRegistry(cache_dir=None)
+        small = registry.font(Path("OpenSans-Bold.ttf"), 12)
+        big = registry.font(Path("OpenSans-Bold.ttf"), 24)
+        assert registry.font(Path("OpenSans-Bold.ttf"), 12) is small
+        assert small.font_bytes is big.font_bytes
+        assert registry.source(big) == "OpenSans-Bold.ttf"
+        assert registry.font("OpenSans-Bold.ttf", 24) is big
+        assert len(registry) == 2
+
+    def test_max_fonts(self):
+        """Test the least recently used fonts are discarded."""
+        registry = fonts.FontRegistry(cache_dir=None, max_fonts=2)
+        small = registry.font(Path("OpenSans-Bold.ttf"), 12)
+        big = registry.font(Path("OpenSans-Bold.ttf"), 24)
+        registry.font(Path("OpenSans-Bold.ttf"), 12)  # 24 is now the least recently used
+        registry.font(Path("OpenSans-Bold.ttf"), 36)
+        assert len(registry) == 2
+        assert registry.font(Path("OpenSans-Bold.ttf"), 12) is small
+        assert registry.font(Path("OpenSans-Bold.ttf"), 24) is not big
+        # discarded fonts still know their source while they are alive
+        assert registry.source(big) == "OpenSans-Bold.ttf"
+
+    def test_download_cache(self, font_server, tmp_path):
+        """Test downloaded fonts are stored in the cache directory."""
+        url, calls = font_server
+        fonts.FontRegistry(cache_dir=tmp_path).font(url, 12)
+        font = fonts.FontRegistry(cache_dir=tmp_path).font(url, 20)
+        assert font.size == 20
+        assert len(calls) == 1
+
+    def test_create_size(self):
+        """Test a font of the package is created again with another size."""
+        font = fonts.create(fonts.opensans_light(12), 30)
+        assert font is fonts.opensans_light(30)
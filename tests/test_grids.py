@@ -1,6 +1,6 @@
 """Test grids module."""
 
-from geepillow import blocks, eeblocks, grids
+from geepillow import blocks, eeblocks, grids, strips
 
 
 class TestGrid:
@@ -68,6 +68,67 @@ class TestGrid:
         )
         pil_image_regression.check(grid.image)
 
+    def test_grid_layout(self, optical_pil_image):
+        """Test the layout of a grid with different size blocks."""
+        im_block_1 = blocks.ImageBlock(optical_pil_image, size=(200, 100))
+        im_block_2 = blocks.ImageBlock(optical_pil_image, size=(100, 300))
+        grid = grids.Grid(blocks=[[im_block_1, im_block_2], [im_block_2]], x_space=10, y_space=5)
+        assert grid.layout.row_heights == [300, 300]
+        assert grid.layout.column_widths == [200, 100]
+        assert grid.grid_size == (320, 610)
+        assert grid.cell_box(1, 0) == (0, 305, 200, 605)
+        assert grid.cell_at(250, 10) == (0, 1)
+        assert grid.cell_at(205, 10) is None
+        assert grid.cell_at(50, 400) == (1, 0)
+
+    def test_grid_processes(self, optical_pil_image):
+        """Test the cells rendered in other processes are equal to the cells rendered in place."""
+        im_block = blocks.ImageBlock(optical_pil_image, size=(200, 100))
+        text_block = blocks.TextBlock(text="Text block", background_color="red")
+        strip = strips.Strip(blocks=[im_block, text_block], orientation="vertical")
+        cells = [[im_block, strip], [text_block, None, im_block]]
+        grid = grids.Grid(blocks=cells, background_color="cyan")
+        parallel = grids.Grid(blocks=cells, background_color="cyan", processes=2)
+        assert parallel.image.tobytes() == grid.image.tobytes()
+
+    def test_grid_modes(self, optical_pil_image):
+        """Test grids of strips in lean modes."""
+        for mode in ["L", "LA", "RGB"]:
+            im_block = blocks.ImageBlock(optical_pil_image, size=(200, 100), mode=mode)
+            text_block = blocks.TextBlock(text="Text", background_color="red", mode=mode)
+            strip = strips.Strip(blocks=[im_block, text_block], orientation="vertical", mode=mode)
+            grid = grids.Grid(blocks=[[strip, text_block], [im_block]], mode=mode)
+            assert grid.image.mode == mode
+            expected = optical_pil_image.convert(mode).resize((100, 100))
+            assert grid.image.crop((50, 0, 150, 100)).tobytes() == expected.tobytes()
+
+    def test_grid_resized_child(self):
+        """Test the size of the grid follows the size of its blocks after rendering."""
+        cell = blocks.Block(size=(100, 100))
+        grid = grids.Grid(blocks=[[cell]])
+        assert grid.image.size == (110, 110)
+        cell.size = (50, 50)
+        assert grid.row_height(0) == 50
+        assert grid.grid_size == (60, 60)
+
+    def test_grid_set_block(self, optical_pil_image):
+        """Test replacing and modifying cells of a rendered grid."""
+        im_block = blocks.ImageBlock(optical_pil_image, size=(200, 100))
+        text_block = blocks.TextBlock(text="Text", background_color="red")
+        cells = [[im_block, text_block], [blocks.TextBlock(text="Text"), None, im_block]]
+        grid = grids.Grid(blocks=cells, background_color="cyan")
+        grid.image  # render it
+        # the layout doesn't change
+        grid.set_block(1, 1, blocks.TextBlock(text="Text", background_color="green"))
+        # the row and column grow
+        grid.set_block(0, 0, blocks.ImageBlock(optical_pil_image, size=(300, 150)))
+        # the column shrinks
+        text_block.text = "A"
+        grid.refresh(0, 1)
+        expected = grids.Grid(blocks=[list(row) for row in cells], background_color="cyan")
+        assert grid.size == expected.size
+        assert grid.image.tobytes() == expected.image.tobytes()
+
 
 class TestEEImageCollectionBlock:
     """Test EEImageCollectionBlock."""
@@ -85,6 +146,20 @@ class TestEEImageCollectionBlock:
         )
         pil_image_regression.check(block.image)
 
+    def test_eeimagecollection_mode(self, s2_collection, s2_collection_geometry, s2_image_viz):
+        """Test the blocks of the cells are created in the mode of the grid."""
+        block = eeblocks.EEImageCollectionGrid(
+            collection=s2_collection,
+            n_columns=3,
+            viz_params=s2_image_viz,
+            scale=10,
+            region=s2_collection_geometry,
+            text_pattern="{system:index}",
+            mode="RGB",
+        )
+        assert all(cell.mode == "RGB" for row in block.blocks for cell in row)
+        assert block.image.mode == "RGB"
+
     def test_eeimagecollection_text(
         self, s2_collection, s2_collection_geometry, s2_image_viz, pil_image_regression
     ):
@@ -139,3 +214,36 @@ class TestEEImageCollectionBlock:
             style_property="style",
         )
         pil_image_regression.check(block.image)
+
+    def test_eeimagecollection_filmstrip(self, s2_collection, s2_collection_geometry, s2_image_viz):
+        """Test the images of a filmstrip are split in the same cells as the images requested separately."""
+        kwargs = dict(
+            collection=s2_collection,
+            n_columns=3,
+            viz_params=s2_image_viz,
+            scale=10,
+            region=s2_collection_geometry,
+        )
+        block = eeblocks.EEImageCollectionGrid(fetch_mode="filmstrip", **kwargs)
+        expected = eeblocks.EEImageCollectionGrid(**kwargs)
+        cells = [cell for row in block.blocks for cell in row if cell is not None]
+        assert cells and not any(isinstance(cell, eeblocks.EEImageBlock) for cell in cells)
+        assert block.grid_size == expected.grid_size
+        assert block.image.size == expected.image.size
+        assert block.image.mode == expected.image.mode
+
+    def test_eeimagecollection_filmstrip_no_region(self, s2_collection, s2_image_viz, caplog):
+        """Test a filmstrip without region falls back to requesting each image separately."""
+        with caplog.at_level("WARNING", logger="geepillow.eeblocks"):
+            block = eeblocks.EEImageCollectionGrid(
+                collection=s2_collection,
+                n_columns=3,
+                viz_params=s2_image_viz,
+                scale=10,
+                fetch_mode="filmstrip",
+                lazy=True,
+            )
+        assert "Filmstrips need a region" in caplog.text
+        cells = [cell for row in block.blocks for cell in row if cell is not None]
+        assert cells and all(isinstance(cell, eeblocks.EEImageBlock) for cell in cells)
+        assert not any(cell.loaded for cell in cells)
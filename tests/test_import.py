@@ -0,0 +1,40 @@
+"""Test the cost of importing the package."""
+
+import subprocess
+import sys
+
+# modules that must only be imported when they are used
+HEAVY_MODULES = ["ee", "geetools", "requests", "numpy", "multiprocessing", "urllib.request"]
+
+
+def run(code: str) -> str:
+    """Run the code in a new interpreter and return its output."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+class TestImport:
+    """Test importing the package is cheap."""
+
+    def test_heavy_modules(self):
+        """Test the heavy modules are not imported with the package."""
+        code = (
+            "import sys\n"
+            "import geepillow.blocks, geepillow.strips, geepillow.grids, geepillow.eeblocks\n"
+            "import geepillow.compositor, geepillow.canvas, geepillow.cache\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+        )
+        assert run(code) == ""
+
+    def test_lazy_fonts(self):
+        """Test the default fonts are loaded on first use."""
+        code = (
+            "from geepillow import blocks, eeblocks, fonts\n"
+            "print(len(fonts.registry))\n"
+            "assert blocks.DEFAULT_FONT is blocks.default_font()\n"
+            "assert eeblocks.DEFAULT_GRID_FONT is eeblocks.default_grid_font()\n"
+            "print(len(fonts.registry))\n"
+        )
+        assert run(code).split() == ["0", "2"]
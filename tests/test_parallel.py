@@ -0,0 +1,34 @@
+"""Test parallel module."""
+
+import pytest
+from PIL import Image
+
+from geepillow import blocks, parallel
+
+
+class TestPasteBlocks:
+    """Test the paste_blocks function."""
+
+    def test_paste_error(self, monkeypatch):
+        """Test a failed paste raises its own error and releases the other memory blocks."""
+        shared_names = []
+        paste_shared = parallel.paste_shared
+
+        def failing_paste(canvas, shared, position):
+            shared_names.append(shared.name)
+            paste_shared(canvas, shared, position)
+            raise OSError("paste failed")
+
+        released = []
+        release_shared = parallel.release_shared
+        monkeypatch.setattr(parallel, "paste_shared", failing_paste)
+        monkeypatch.setattr(
+            parallel, "release_shared", lambda shared: released.append(release_shared(shared))
+        )
+        canvas = Image.new("RGBA", (30, 10))
+        positions = [(blocks.Block(size=(10, 10)), (10 * i, 0)) for i in range(3)]
+        with pytest.raises(OSError, match="paste failed"):
+            parallel.paste_blocks(canvas, positions, processes=2)
+        # the pool queues all the blocks at once, so every block but the failed one is released
+        assert len(shared_names) == 1
+        assert len(released) == 2
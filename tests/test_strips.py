@@ -61,3 +61,15 @@ class TestStrip:
         # create a strip
         strip = strips.Strip(blocks=[im_block, txt_block], size=(400, 300), background_color="blue")
         pil_image_regression.check(strip.image)
+
+    def test_strip_set_block(self, optical_pil_image):
+        """Test replacing a block of a rendered strip."""
+        im_block = blocks.ImageBlock(optical_pil_image, size=(200, 100))
+        txt_block = blocks.TextBlock(text="Text block", background_color="red")
+        strip = strips.Strip(blocks=[txt_block, im_block, None], background_color="blue")
+        strip.image  # render it
+        strip.set_block(0, blocks.TextBlock(text="A longer text block", background_color="red"))
+        strip.set_block(2, txt_block)
+        expected = strips.Strip(blocks=list(strip._blocks), background_color="blue")
+        assert strip.size == expected.size
+        assert strip.image.tobytes() == expected.image.tobytes()
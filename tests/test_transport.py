@@ -0,0 +1,56 @@
+"""Test transport module."""
+
+import pytest
+
+from geepillow.transport import Transport
+
+
+@pytest.fixture
+def flaky_server(http_server):
+    """A local server that fails twice with 503 before answering."""
+    return http_server(lambda n: (503, b"busy") if n <= 2 else (200, b"ok"))
+
+
+class TestTransport:
+    """Test the Transport class."""
+
+    def test_retry(self, flaky_server):
+        """Test that transient errors are retried."""
+        url, calls = flaky_server
+        transport = Transport(backoff_factor=0)
+        response = transport.get(url)
+        assert response.status_code == 200
+        assert response.content == b"ok"
+        assert len(calls) == 3
+
+    def test_retry_exhausted(self, flaky_server):
+        """Test that the last response is returned when retries are exhausted."""
+        url, calls = flaky_server
+        transport = Transport(max_retries=1, backoff_factor=0)
+        response = transport.get(url)
+        assert response.status_code == 503
+        assert len(calls) == 2
+
+    def test_backoff(self):
+        """Test the backoff is bounded."""
+        transport = Transport(backoff_factor=1, max_backoff=4)
+        assert 0 <= transport.backoff(0) <= 1
+        assert 0 <= transport.backoff(10) <= 4
+
+    def test_call(self):
+        """Test that transient errors of a function are retried and the others raised."""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) <= 2:
+                raise RuntimeError("too many requests" if len(calls) == 1 else "busy")
+            return "ok"
+
+        transport = Transport(backoff_factor=0)
+        assert transport.call(flaky, RuntimeError) == "ok"
+        assert len(calls) == 3
+        calls.clear()
+        with pytest.raises(RuntimeError, match="busy"):
+            transport.call(flaky, RuntimeError, lambda e: "too many" in str(e))
+        assert len(calls) == 2